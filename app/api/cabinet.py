@@ -1,13 +1,25 @@
 """User Cabinet API routes."""
 from __future__ import annotations
 
-from typing import Any, List
+import asyncio
+from typing import Any, AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+import orjson
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, Body
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter
 
 from ..core.auth import AuthenticatedUser, require_auth
-from ..services.billing_service import billing_service
-from ..clients.supabase_client import get_supabase
+from ..core.cache import cache_get, cache_set
+from ..core.http_cache import (
+    REVALIDATE_CACHE_CONTROL,
+    conditional_json_response,
+    conditional_response,
+)
+from ..services.billing_service import TransactionCursor, billing_service
+from ..services.loaders import profile_loader
+from ..clients.supabase_client import execute_query, get_supabase
 from ..schemas.cabinet import (
     AccountStatus,
     CreditBalance,
@@ -24,28 +36,33 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/cabinet", tags=["cabinet"])
 
+# Shared auth dependency for every cabinet route
+AuthDep = Depends(require_auth)
 
-@router.get("/status", response_model=AccountStatus)
-async def get_account_status(
-    user: AuthenticatedUser = Depends(require_auth)
+# Serializer for the hot /status endpoint, built once at import
+_STATUS_ADAPTER = TypeAdapter(AccountStatus)
+
+# Transaction pages larger than this are streamed instead of buffered
+TRANSACTIONS_STREAM_THRESHOLD = 500
+
+
+async def _fetch_profile(user_id: str) -> UserProfile | None:
+    """Fetch a user's profile, batched with concurrent lookups; None if no row exists."""
+    row = await profile_loader.load(user_id)
+    return UserProfile(**row) if row else None
+
+
+def _build_account_status(
+    user: AuthenticatedUser,
+    profile: UserProfile | None,
+    credits: int,
+    subscription_status: SubscriptionStatus
 ) -> AccountStatus:
-    """Get complete account status for dashboard."""
-    # Get billing status
-    subscription_status = await billing_service.get_subscription_status(user.id)
-    credits = await billing_service.get_credit_balance(user.id)
-    
-    # Get profile
-    supabase = get_supabase()
-    profile_data = None
-    if supabase:
-        resp = supabase.table("profiles").select("*").eq("id", user.id).single().execute()
-        if resp.data:
-            profile_data = UserProfile(**resp.data)
-    
+    """Assemble the dashboard payload."""
     return AccountStatus(
         user_id=user.id,
         email=user.email,
-        profile=profile_data,
+        profile=profile,
         credits=credits,
         subscription=subscription_status,
         can_generate=subscription_status.can_generate,
@@ -53,37 +70,132 @@ async def get_account_status(
     )
 
 
+async def _load_account_status(user: AuthenticatedUser) -> AccountStatus:
+    """Load profile and billing data for the dashboard."""
+    if billing_service.is_configured:
+        # Single round-trip via the cabinet_status database function
+        snapshot = await billing_service.get_account_snapshot(user.id)
+        if snapshot is not None:
+            credits = snapshot.get("credits") or 0
+            subscription_status = billing_service.build_subscription_status(
+                snapshot.get("subscription"), credits
+            )
+            profile = snapshot.get("profile")
+            return _build_account_status(
+                user,
+                UserProfile(**profile) if profile else None,
+                credits,
+                subscription_status
+            )
+    
+    # Fallback: billing and profile lookups are independent, run them concurrently
+    (subscription_status, credits), profile_data = await asyncio.gather(
+        billing_service.get_billing_snapshot(user.id),
+        _fetch_profile(user.id),
+    )
+    return _build_account_status(user, profile_data, credits, subscription_status)
+
+
+@router.get("/status", responses={200: {"model": AccountStatus}})
+async def get_account_status(
+    request: Request,
+    user: AuthenticatedUser = AuthDep
+) -> Response:
+    """Get complete account status for dashboard."""
+    account_status = await _load_account_status(user)
+    # Already a validated model: serialize once, skipping response_model revalidation
+    return conditional_json_response(request, _STATUS_ADAPTER.dump_json(account_status))
+
+
 @router.get("/credits", response_model=CreditBalance)
 async def get_credits(
-    user: AuthenticatedUser = Depends(require_auth)
+    request: Request,
+    response: Response,
+    user: AuthenticatedUser = AuthDep
 ) -> CreditBalance:
     """Get current credit balance."""
-    balance = await billing_service.get_credit_balance(user.id)
-    return CreditBalance(user_id=user.id, balance=balance)
+    key = user.cache_keys["credits"]
+    cached = await cache_get(key)
+    if cached is not None:
+        balance = int(cached)
+    else:
+        balance = await billing_service.get_credit_balance(user.id)
+        await cache_set(key, str(balance))
+    return conditional_response(request, response, CreditBalance(user_id=user.id, balance=balance))
+
+
+async def _stream_json_array(rows: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """Encode rows as a JSON array one element at a time."""
+    yield b"["
+    first = True
+    async for row in rows:
+        if not first:
+            yield b","
+        yield orjson.dumps(row)
+        first = False
+    yield b"]"
 
 
-@router.get("/transactions", response_model=List[dict])
+@router.get("/transactions", response_model=List[dict], response_class=ORJSONResponse)
 async def get_transactions(
+    response: Response,
     limit: int = 50,
-    offset: int = 0,
-    user: AuthenticatedUser = Depends(require_auth)
+    offset: int = Query(default=0, deprecated=True),
+    cursor: Optional[str] = None,
+    user: AuthenticatedUser = AuthDep
 ) -> List[dict]:
-    """Get transaction history."""
-    return await billing_service.get_transaction_history(user.id, limit, offset)
+    """
+    Get transaction history.
+    Pass the X-Next-Cursor header of a page as `cursor` to fetch the next one.
+    Large pages are streamed as a JSON array and carry no X-Next-Cursor.
+    """
+    position = None
+    if cursor:
+        try:
+            position = TransactionCursor.parse(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid cursor")
+    
+    if limit > TRANSACTIONS_STREAM_THRESHOLD:
+        rows = billing_service.stream_transactions(user.id, limit, offset, cursor=position)
+        return StreamingResponse(
+            _stream_json_array(rows),
+            media_type="application/json",
+            headers={"Cache-Control": REVALIDATE_CACHE_CONTROL}
+        )
+    
+    transactions = await billing_service.get_transaction_history(
+        user.id, limit, offset, cursor=position
+    )
+    response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+    
+    if len(transactions) == limit:
+        response.headers["X-Next-Cursor"] = str(TransactionCursor.from_row(transactions[-1]))
+    
+    return transactions
 
 
 @router.get("/subscription", response_model=SubscriptionStatus)
 async def get_subscription(
-    user: AuthenticatedUser = Depends(require_auth)
+    request: Request,
+    response: Response,
+    user: AuthenticatedUser = AuthDep
 ) -> SubscriptionStatus:
     """Get current subscription status."""
-    return await billing_service.get_subscription_status(user.id)
+    key = user.cache_keys["sub"]
+    cached = await cache_get(key)
+    if cached is not None:
+        subscription_status = SubscriptionStatus.model_validate_json(cached)
+    else:
+        subscription_status = await billing_service.get_subscription_status(user.id)
+        await cache_set(key, subscription_status.model_dump_json())
+    return conditional_response(request, response, subscription_status)
 
 
 @router.post("/profile", response_model=UserProfile)
 async def update_profile(
     update: ProfileUpdate,
-    user: AuthenticatedUser = Depends(require_auth)
+    user: AuthenticatedUser = AuthDep
 ) -> UserProfile:
     """Update user profile."""
     supabase = get_supabase()
@@ -93,21 +205,26 @@ async def update_profile(
             detail="Database service unavailable"
         )
     
-    # Filter out None values
-    update_data = {k: v for k, v in update.model_dump().items() if v is not None}
+    # Only fields the client actually set
+    update_data = update.model_dump(exclude_none=True)
     
     if not update_data:
         # Return existing profile if no updates
-        resp = supabase.table("profiles").select("*").eq("id", user.id).single().execute()
-        return UserProfile(**resp.data)
-    
-    update_data["updated_at"] = "now()"
+        profile = await _fetch_profile(user.id)
+        if not profile:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Profile not found"
+            )
+        return profile
     
+    # Single INSERT ... ON CONFLICT (id) DO UPDATE ... RETURNING statement;
+    # also creates the row if the signup trigger never did.
+    # updated_at is set server-side by the update_profiles_updated_at trigger.
     try:
-        resp = supabase.table("profiles") \
-            .update(update_data) \
-            .eq("id", user.id) \
-            .execute()
+        query = supabase.table("profiles") \
+            .upsert({"id": user.id, **update_data}, on_conflict="id")
+        resp = await execute_query(query)
         
         if not resp.data:
             raise HTTPException(
@@ -116,20 +233,25 @@ async def update_profile(
             )
             
         return UserProfile(**resp.data[0])
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Failed to update profile for {user.id}: {e}")
+        logger.error("Failed to update profile for %s: %s", user.id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update profile"
         )
 
 
-@router.get("/projects", response_model=List[dict])
+@router.get("/projects", response_model=List[dict], response_class=ORJSONResponse)
 async def get_projects(
-    user: AuthenticatedUser = Depends(require_auth)
+    request: Request,
+    response: Response,
+    user: AuthenticatedUser = AuthDep
 ) -> List[dict]:
     """Get user's projects."""
-    return await billing_service.get_user_projects(user.id)
+    projects = await billing_service.get_user_projects(user.id)
+    return conditional_response(request, response, projects, cache_control=REVALIDATE_CACHE_CONTROL)
 
 
 # ==================== Dev/Simulated Endpoints ====================
@@ -137,7 +259,7 @@ async def get_projects(
 @router.post("/credits/purchase_simulated", response_model=CreditDeductResponse)
 async def simulate_purchase(
     request: CreditAddRequest,
-    user: AuthenticatedUser = Depends(require_auth)
+    user: AuthenticatedUser = AuthDep
 ) -> CreditDeductResponse:
     """
     Simulate a credit purchase (Dev only).
@@ -1,10 +1,20 @@
 """Project API routes."""
 from __future__ import annotations
 
-from typing import Any, Optional
-
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Request, UploadFile
-from fastapi.responses import FileResponse, StreamingResponse
+import asyncio
+import os
+import re
+import subprocess
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+import anyio
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 
 from ..schemas.project import ProjectCreate, ProjectResponse
 from ..schemas.segment import SegmentUpdate
@@ -12,6 +22,7 @@ from ..schemas.common import RunResponse
 from ..repositories.project_repo import ProjectRepository
 from ..repositories.file_storage import FileStorage
 from ..services.pipeline_service import PipelineService
+from ..services.render_service import RenderService
 from ..services.image_service import ImageService
 from ..services.story_service import StoryboardService
 from ..services.subtitle_service import SubtitleService
@@ -37,6 +48,7 @@ from ..core.auth import AuthenticatedUser, get_optional_user
 from ..core.audio_utils import (
     validate_audio_format,
     get_audio_duration,
+    probe_audio_stream,
     parse_time,
     AudioValidationError,
     AudioLoadError,
@@ -44,12 +56,94 @@ from ..core.audio_utils import (
 
 logger = get_logger(__name__)
 
-router = APIRouter(prefix="/projects", tags=["projects"])
+router = APIRouter(
+    prefix="/projects",
+    tags=["projects"],
+    default_response_class=ORJSONResponse,
+)
 
 # Initialize dependencies
 project_repo = ProjectRepository()
 file_storage = FileStorage()
 
+# Chunk size for media reads; large chunks keep the syscall count low
+RENDER_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class MediaFileResponse(FileResponse):
+    """FileResponse that reads in large chunks (Starlette's default is 64 KiB)."""
+    chunk_size = RENDER_CHUNK_SIZE
+
+# (project_id, render_name) -> (path, stat). A player scrubbing a video sends
+# many range requests per second; this saves re-resolving and re-stat()ing
+# the file for each one. Renders are written once under a new name.
+_RENDER_META: TTLCache = TTLCache(maxsize=1024, ttl=5)
+
+# Single byte range only; multipart ranges are not served
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Project ids already confirmed on disk. Projects are never deleted through
+# the API, so a confirmed id stays valid for the life of the process.
+_KNOWN_PROJECTS: set[str] = set()
+
+
+async def require_project(project_id: str) -> str:
+    """Dependency: 404 unless the project exists (checked on disk once per id)."""
+    if project_id not in _KNOWN_PROJECTS:
+        if not project_repo.exists(project_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        _KNOWN_PROJECTS.add(project_id)
+    return project_id
+
+
+ProjectDep = Depends(require_project)
+
+# Bodies for the "not ready yet" replies the UI polls for while a pipeline runs.
+# Only the bytes are shared: a Response instance can't be reused, because
+# middleware appends headers to its header list in place.
+_EMPTY_SEGMENTS_BODY = orjson.dumps({"segments": []})
+_EMPTY_OBJECT_BODY = orjson.dumps({})
+
+
+def _json_body(body: bytes) -> Response:
+    """Wrap an already-encoded JSON body in a response."""
+    return Response(content=body, media_type="application/json")
+
+
+# Caps pipeline runs, renders, regenerations and transcriptions so heavy work
+# can't starve the threadpool that cheap reads also depend on.
+_GENERATION_SLOTS = asyncio.Semaphore(settings.max_concurrent_generations)
+
+
+# Background jobs hold slots for minutes, so interactive requests only wait
+# briefly and otherwise ask the client to retry.
+_SLOT_WAIT_SECONDS = 5
+_SLOT_RETRY_AFTER_SECONDS = 15
+
+
+async def _run_limited(job: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+    """Run a background job once a generation slot is free."""
+    async with _GENERATION_SLOTS:
+        return await job(*args)
+
+
+@asynccontextmanager
+async def _interactive_slot() -> AsyncIterator[None]:
+    """Hold a generation slot for a request, or fail fast with 503 when all are busy."""
+    try:
+        await asyncio.wait_for(_GENERATION_SLOTS.acquire(), timeout=_SLOT_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="All generation slots are busy, try again shortly",
+            headers={"Retry-After": str(_SLOT_RETRY_AFTER_SECONDS)},
+        )
+    try:
+        yield
+    finally:
+        _GENERATION_SLOTS.release()
+
+
 def get_pipeline_service() -> PipelineService:
     return PipelineService(project_repo, file_storage)
 
@@ -79,6 +173,7 @@ async def create_project(
 ) -> dict[str, Any]:
     """Create a new project and link it to user if authenticated."""
     project = project_repo.create(payload.model_dump())
+    _KNOWN_PROJECTS.add(project["id"])
     
     if user:
         await billing_service.link_user_project(
@@ -107,60 +202,74 @@ async def get_project(project_id: str) -> dict[str, Any]:
     return project
 
 
-@router.post("/{project_id}/upload", response_model=RunResponse)
+@router.post("/{project_id}/upload", response_model=RunResponse, dependencies=[ProjectDep])
 async def upload_audio(project_id: str, audio: UploadFile = File(...)) -> RunResponse:
     """Upload audio file for a project."""
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
     # Validate audio format BEFORE saving
     try:
         validate_audio_format(audio.content_type, audio.filename)
     except AudioValidationError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
-    project_repo.ensure_dirs(project_id)
-    audio_path = file_storage.save_audio(project_id, audio.file, audio.filename or "track.wav")
+    max_duration_seconds = settings.max_audio_duration_minutes * 60
     
-    # Validate Duration using unified function
+    # Most formats carry their duration in the header: reject over-long audio
+    # before copying it, and skip re-probing the saved file
     try:
-        duration = get_audio_duration(audio_path)
-        
-        max_duration_seconds = settings.max_audio_duration_minutes * 60
-        if duration > max_duration_seconds:
-            # Delete the file if it exceeds the limit
+        duration = await run_in_threadpool(probe_audio_stream, audio.file, audio.size)
+    except Exception as e:
+        logger.warning("Could not probe uploaded audio header: %s", e)
+        duration = None
+    if duration is not None and duration > max_duration_seconds:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Audio duration ({duration:.1f}s) exceeds maximum allowed ({settings.max_audio_duration_minutes} min)."
+        )
+    
+    project_repo.ensure_dirs(project_id)
+    audio_path = await file_storage.save_audio_stream(
+        project_id, audio, audio.filename or "track.wav"
+    )
+    
+    # Formats without a readable header: probe the saved file (off the loop)
+    if duration is None:
+        try:
+            duration = await run_in_threadpool(get_audio_duration, audio_path)
+            
+            if duration > max_duration_seconds:
+                # Delete the file if it exceeds the limit
+                try:
+                    if audio_path.exists():
+                        audio_path.unlink()
+                except Exception as delete_err:
+                    logger.error(f"Failed to delete rejected audio file: {delete_err}")
+                    
+                raise HTTPException(
+                    status_code=400, 
+                    detail=f"Audio duration ({duration:.1f}s) exceeds maximum allowed ({settings.max_audio_duration_minutes} min)."
+                )
+                
+        except AudioLoadError as e:
+            # Delete invalid file
             try:
                 if audio_path.exists():
                     audio_path.unlink()
             except Exception as delete_err:
-                logger.error(f"Failed to delete rejected audio file: {delete_err}")
-                
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Audio duration ({duration:.1f}s) exceeds maximum allowed ({settings.max_audio_duration_minutes} min)."
-            )
-            
-    except AudioLoadError as e:
-        # Delete invalid file
-        try:
-            if audio_path.exists():
-                audio_path.unlink()
-        except Exception as delete_err:
-            logger.error(f"Failed to delete invalid audio file: {delete_err}")
-        raise HTTPException(status_code=400, detail=f"Invalid audio file: {e}")
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected audio validation error: {e}")
-        # Keep the file but log the issue
-        pass
+                logger.error(f"Failed to delete invalid audio file: {delete_err}")
+            raise HTTPException(status_code=400, detail=f"Invalid audio file: {e}")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected audio validation error: {e}")
+            # Keep the file but log the issue
+            pass
 
     project_repo.update(project_id, {"status": "UPLOADED"})
     
     return RunResponse(status="OK", message="Audio uploaded")
 
 
-@router.post("/{project_id}/run", response_model=RunResponse)
+@router.post("/{project_id}/run", response_model=RunResponse, dependencies=[ProjectDep])
 async def run_project(
     project_id: str,
     background: BackgroundTasks,
@@ -173,9 +282,6 @@ async def run_project(
     Requires authentication and sufficient credits when billing is enabled.
     Credits will be deducted based on the number of segments.
     """
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
     # Verify user has minimum credits to start (e.g. 5)
     # The actual amount will be deducted in the pipeline once segments are generated
     billing.require_credits(5)
@@ -187,7 +293,7 @@ async def run_project(
     })
     project_repo.update_job(project_id, "pipeline", {"status": "RUNNING", "step": "queued"})
     
-    background.add_task(pipeline_service.run_full_pipeline, project_id)
+    background.add_task(_run_limited, pipeline_service.run_full_pipeline, project_id)
     
     return RunResponse(
         status="OK",
@@ -195,16 +301,18 @@ async def run_project(
     )
 
 
-@router.get("/{project_id}/analysis")
-async def get_analysis(project_id: str) -> dict[str, Any]:
+@router.get("/{project_id}/analysis", response_model=None)
+async def get_analysis(project_id: str) -> Response:
     """Get audio analysis results. Returns empty object if not ready yet."""
-    analysis = project_repo.get_analysis(project_id)
-    # Return empty object instead of 404 to support progressive loading
-    return analysis or {}
+    analysis = project_repo.load_bundle(project_id).analysis
+    if not analysis:
+        # Return empty object instead of 404 to support progressive loading
+        return _json_body(_EMPTY_OBJECT_BODY)
+    return ORJSONResponse(analysis)
 
 
 @router.get("/{project_id}/audio")
-async def get_project_audio(project_id: str) -> FileResponse:
+async def get_project_audio(project_id: str, request: Request) -> Response:
     """Get the project's audio file."""
     audio_path = file_storage.get_audio_path(project_id)
     if not audio_path:
@@ -214,54 +322,58 @@ async def get_project_audio(project_id: str) -> FileResponse:
     if audio_path.suffix == ".mp3":
         media_type = "audio/mpeg"
     
-    return FileResponse(audio_path, media_type=media_type)
+    return _serve_media(request, audio_path, os.stat(audio_path), media_type)
+
+
+def _enrich_segment(
+    segment: dict[str, Any],
+    seg_id: str,
+    prompt: dict[str, Any],
+    max_v: int,
+    image_prefix: str,
+) -> dict[str, Any]:
+    """Return a copy of a segment with its prompt, version info and thumbnail."""
+    # Only set thumbnail if images exist; cap version at max available to avoid 404s
+    thumbnail = None
+    if max_v > 0:
+        thumbnail = f"{image_prefix}{seg_id}_v{min(prompt.get('version', 1), max_v)}.png"
+    return {**segment, "id": seg_id, "max_version": max_v, "thumbnail": thumbnail, "prompt": prompt}
 
 
-@router.get("/{project_id}/segments")
-async def get_segments(project_id: str) -> dict[str, Any]:
+@router.get("/{project_id}/segments", response_model=None)
+async def get_segments(project_id: str) -> Response:
     """Get storyboard segments."""
-    segments = project_repo.get_segments(project_id)
+    bundle = project_repo.load_bundle(project_id)
+    segments = bundle.segments
     if not segments:
         # Return empty list instead of 404 to support progressive loading
-        return {"segments": []}
+        return _json_body(_EMPTY_SEGMENTS_BODY)
     
     # Handle malformed segments
     if isinstance(segments, list) and len(segments) == 1 and "raw" in segments[0]:
         logger.warning("Project %s has malformed segments.json", project_id)
-        return {"segments": []}
+        return _json_body(_EMPTY_SEGMENTS_BODY)
     
-    prompts = project_repo.get_prompts(project_id)
-    enriched = []
+    prompts_get = bundle.prompts.get
+    versions_get = file_storage.get_all_max_versions(project_id).get
+    image_prefix = f"/projects/{project_id}/images/"
     
-    for segment in segments:
-        if not isinstance(segment, dict):
-            continue
-        
-        seg_id = segment.get("id") or segment.get("segment_id")
-        if not seg_id:
-            continue
-        
-        segment["id"] = str(seg_id)
-        prompt = prompts.get(str(seg_id), {})
-        version = prompt.get("version", 1)
-        
-        # Add available versions info
-        max_v = file_storage.get_max_version(project_id, str(seg_id))
-        segment["max_version"] = max_v
-        
-        # Only set thumbnail if images exist
-        if max_v > 0:
-            # Cap version at max available to avoid 404s
-            display_ver = version if version <= max_v else max_v
-            segment["thumbnail"] = f"/projects/{project_id}/images/{seg_id}_v{display_ver}.png"
-        else:
-            segment["thumbnail"] = None
-            
-        segment["prompt"] = prompt
-        
-        enriched.append(segment)
+    enriched = [
+        _enrich_segment(segment, sid, prompts_get(sid, {}), versions_get(sid, 0), image_prefix)
+        for segment in segments
+        if isinstance(segment, dict)
+        and (sid := str(segment.get("id") or segment.get("segment_id") or ""))
+    ]
     
-    return {"segments": enriched}
+    return ORJSONResponse({"segments": enriched})
+
+
+# SegmentUpdate fields stored on the segment vs. on its image prompt
+_SEGMENT_FIELDS = frozenset({
+    "visual_intent", "effect", "start_time", "end_time",
+    "lyric_text", "text", "camera_angle", "emotion",
+})
+_PROMPT_FIELDS = frozenset({"image_prompt", "negative_prompt", "style_hints", "version"})
 
 
 @router.patch("/{project_id}/segments/{seg_id}")
@@ -271,61 +383,26 @@ async def update_segment(
     payload: SegmentUpdate,
 ) -> dict[str, Any]:
     """Update a segment's properties."""
-    segments = project_repo.get_segments(project_id)
-    prompts = project_repo.get_prompts(project_id)
-    
-    if not segments:
-        raise HTTPException(status_code=404, detail="Segments not found")
-    
-    updated_segment = None
-    for segment in segments:
-        if segment.get("id") == seg_id:
-            if payload.visual_intent is not None:
-                segment["visual_intent"] = payload.visual_intent
-            if payload.effect is not None:
-                segment["effect"] = payload.effect
-            if payload.start_time is not None:
-                segment["start_time"] = payload.start_time
-            if payload.end_time is not None:
-                segment["end_time"] = payload.end_time
-            if payload.lyric_text is not None:
-                segment["lyric_text"] = payload.lyric_text
-            if payload.text is not None:
-                segment["text"] = payload.text
-            if payload.camera_angle is not None:
-                segment["camera_angle"] = payload.camera_angle
-            if payload.emotion is not None:
-                segment["emotion"] = payload.emotion
-            updated_segment = segment
-            break
+    # Only fields the client sent; an explicit null still means "leave as is"
+    segment_updates = payload.model_dump(include=_SEGMENT_FIELDS, exclude_unset=True, exclude_none=True)
+    prompt_updates = payload.model_dump(include=_PROMPT_FIELDS, exclude_unset=True, exclude_none=True)
     
+    updated_segment = project_repo.update_segment(project_id, seg_id, segment_updates)
     if updated_segment is None:
         raise HTTPException(status_code=404, detail="Segment not found")
     
-    # Add available versions info
-    max_v = file_storage.get_max_version(project_id, str(seg_id))
-    updated_segment["max_version"] = max_v
-    
-    # Update prompts
-    prompt = prompts.get(seg_id, {"version": 1})
-    if payload.image_prompt is not None:
-        prompt["image_prompt"] = payload.image_prompt
-    if payload.negative_prompt is not None:
-        prompt["negative_prompt"] = payload.negative_prompt
-    if payload.style_hints is not None:
-        prompt["style_hints"] = payload.style_hints
-    if payload.version is not None:
-        prompt["version"] = payload.version
-    
-    prompts[seg_id] = prompt
+    if prompt_updates:
+        prompt = project_repo.update_prompt(project_id, seg_id, prompt_updates)
+    else:
+        prompt = project_repo.get_prompts(project_id).get(seg_id, {"version": 1})
     
-    project_repo.save_segments(project_id, segments)
-    project_repo.save_prompts(project_id, prompts)
+    # Add available versions info
+    updated_segment["max_version"] = file_storage.get_max_version(project_id, str(seg_id))
     
     return {"segment": updated_segment, "prompt": prompt}
 
 
-@router.post("/{project_id}/segments/{seg_id}/regenerate")
+@router.post("/{project_id}/segments/{seg_id}/regenerate", dependencies=[ProjectDep])
 async def regenerate_scene(
     project_id: str,
     seg_id: str,
@@ -337,51 +414,50 @@ async def regenerate_scene(
     
     Requires 1 credit per regeneration.
     """
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Deduct 1 credit for regeneration
-    transaction_id = await deduct_generation_credits(
-        billing,
-        amount=1,
-        description=f"Regenerate segment {seg_id}",
-        reference_id=f"{project_id}:{seg_id}"
-    )
-    
-    try:
-        logger.info(f"[REGENERATE] Starting regeneration: project_id={project_id}, seg_id={seg_id}")
-        prompt = image_service.regenerate_segment(project_id, seg_id)
-        
-        project_repo.update_job(project_id, "pipeline", {
-            "status": "DONE",
-            "step": "regenerate",
-            "message": f"Regenerated {seg_id} v{prompt.get('version', 1)}",
-        })
-        
-        return {
-            "segment_id": seg_id,
-            "prompt": prompt,
-            "credits_used": 1,
-            "transaction_id": transaction_id
-        }
-    except KeyError:
-        # Refund on error
-        await refund_generation_credits(
-            billing, amount=1, transaction_id=transaction_id,
-            reason=f"Segment {seg_id} not found - refund"
-        )
-        raise HTTPException(status_code=404, detail="Segment not found")
-    except Exception as e:
-        # Refund on any generation error
-        await refund_generation_credits(
-            billing, amount=1, transaction_id=transaction_id,
-            reason=f"Regeneration failed: {str(e)}"
+    # Take a slot before charging, so a busy server never bills for nothing
+    async with _interactive_slot():
+        # Deduct 1 credit for regeneration
+        transaction_id = await deduct_generation_credits(
+            billing,
+            amount=1,
+            description=f"Regenerate segment {seg_id}",
+            reference_id=f"{project_id}:{seg_id}"
         )
-        logger.error(f"Regeneration failed for {seg_id}: {e}")
-        raise HTTPException(status_code=500, detail="Regeneration failed")
+        
+        try:
+            logger.info(f"[REGENERATE] Starting regeneration: project_id={project_id}, seg_id={seg_id}")
+            prompt = await run_in_threadpool(image_service.regenerate_segment, project_id, seg_id)
+            
+            project_repo.update_job(project_id, "pipeline", {
+                "status": "DONE",
+                "step": "regenerate",
+                "message": f"Regenerated {seg_id} v{prompt.get('version', 1)}",
+            })
+            
+            return {
+                "segment_id": seg_id,
+                "prompt": prompt,
+                "credits_used": 1,
+                "transaction_id": transaction_id
+            }
+        except KeyError:
+            # Refund on error
+            await refund_generation_credits(
+                billing, amount=1, transaction_id=transaction_id,
+                reason=f"Segment {seg_id} not found - refund"
+            )
+            raise HTTPException(status_code=404, detail="Segment not found")
+        except Exception as e:
+            # Refund on any generation error
+            await refund_generation_credits(
+                billing, amount=1, transaction_id=transaction_id,
+                reason=f"Regeneration failed: {str(e)}"
+            )
+            logger.error(f"Regeneration failed for {seg_id}: {e}")
+            raise HTTPException(status_code=500, detail="Regeneration failed")
 
 
-@router.post("/{project_id}/segments/{seg_id}/regenerate-prompt")
+@router.post("/{project_id}/segments/{seg_id}/regenerate-prompt", dependencies=[ProjectDep])
 async def regenerate_prompt(
     project_id: str,
     seg_id: str,
@@ -396,29 +472,27 @@ async def regenerate_prompt(
     Let's make it free since it doesn't use the image generation model cost, 
     only text generation which is negligible compared to image.
     """
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    try:
-        prompt = image_service.regenerate_prompt_only(project_id, seg_id)
-        
-        project_repo.update_job(project_id, "pipeline", {
-            "status": "DONE",
-            "step": "regenerate-prompt",
-            "message": f"Regenerated prompt for {seg_id}",
-        })
-        
-        return {
-            "segment_id": seg_id,
-            "prompt": prompt,
-            "credits_used": 0
-        }
-    except Exception as e:
-        logger.error(f"Prompt regeneration failed for {seg_id}: {e}")
-        raise HTTPException(status_code=500, detail="Prompt regeneration failed")
+    async with _interactive_slot():
+        try:
+            prompt = await run_in_threadpool(image_service.regenerate_prompt_only, project_id, seg_id)
+            
+            project_repo.update_job(project_id, "pipeline", {
+                "status": "DONE",
+                "step": "regenerate-prompt",
+                "message": f"Regenerated prompt for {seg_id}",
+            })
+            
+            return {
+                "segment_id": seg_id,
+                "prompt": prompt,
+                "credits_used": 0
+            }
+        except Exception as e:
+            logger.error(f"Prompt regeneration failed for {seg_id}: {e}")
+            raise HTTPException(status_code=500, detail="Prompt regeneration failed")
 
 
-@router.post("/{project_id}/segments/{seg_id}/regenerate-image")
+@router.post("/{project_id}/segments/{seg_id}/regenerate-image", dependencies=[ProjectDep])
 async def regenerate_image_only(
     project_id: str,
     seg_id: str,
@@ -430,51 +504,47 @@ async def regenerate_image_only(
     
     Requires 1 credit.
     """
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Deduct 1 credit for regeneration
-    transaction_id = await deduct_generation_credits(
-        billing,
-        amount=1,
-        description=f"Regenerate image {seg_id}",
-        reference_id=f"{project_id}:{seg_id}:img"
-    )
-    
-    try:
-        prompt = image_service.regenerate_image_only(project_id, seg_id)
-        
-        project_repo.update_job(project_id, "pipeline", {
-            "status": "DONE",
-            "step": "regenerate-image",
-            "message": f"Regenerated image {seg_id} v{prompt.get('version', 1)}",
-        })
-        
-        return {
-            "segment_id": seg_id,
-            "prompt": prompt,
-            "credits_used": 1,
-            "transaction_id": transaction_id
-        }
-    except Exception as e:
-        # Refund on any generation error
-        await refund_generation_credits(
-            billing, amount=1, transaction_id=transaction_id,
-            reason=f"Regeneration failed: {str(e)}"
+    # Take a slot before charging, so a busy server never bills for nothing
+    async with _interactive_slot():
+        # Deduct 1 credit for regeneration
+        transaction_id = await deduct_generation_credits(
+            billing,
+            amount=1,
+            description=f"Regenerate image {seg_id}",
+            reference_id=f"{project_id}:{seg_id}:img"
         )
-        logger.error(f"Image regeneration failed for {seg_id}: {e}")
-        raise HTTPException(status_code=500, detail="Image regeneration failed")
+        
+        try:
+            prompt = await run_in_threadpool(image_service.regenerate_image_only, project_id, seg_id)
+            
+            project_repo.update_job(project_id, "pipeline", {
+                "status": "DONE",
+                "step": "regenerate-image",
+                "message": f"Regenerated image {seg_id} v{prompt.get('version', 1)}",
+            })
+            
+            return {
+                "segment_id": seg_id,
+                "prompt": prompt,
+                "credits_used": 1,
+                "transaction_id": transaction_id
+            }
+        except Exception as e:
+            # Refund on any generation error
+            await refund_generation_credits(
+                billing, amount=1, transaction_id=transaction_id,
+                reason=f"Regeneration failed: {str(e)}"
+            )
+            logger.error(f"Image regeneration failed for {seg_id}: {e}")
+            raise HTTPException(status_code=500, detail="Image regeneration failed")
 
 
-@router.post("/{project_id}/recalculate-timings", response_model=RunResponse)
+@router.post("/{project_id}/recalculate-timings", response_model=RunResponse, dependencies=[ProjectDep])
 async def recalculate_timings(
     project_id: str,
     story_service: StoryboardService = Depends(get_story_service)
 ) -> RunResponse:
     """Recalculate segment timings to evenly distribute across audio duration using RHYTHMIC analysis."""
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
     # Get current segments and analysis
     segments = project_repo.get_segments(project_id)
     analysis = project_repo.get_analysis(project_id)
@@ -510,7 +580,7 @@ async def recalculate_timings(
         raise HTTPException(status_code=500, detail=f"Recalculation failed: {e}")
 
 
-@router.post("/{project_id}/render", response_model=RunResponse)
+@router.post("/{project_id}/render", response_model=RunResponse, dependencies=[ProjectDep])
 async def render_project(
     project_id: str,
     background: BackgroundTasks,
@@ -522,84 +592,168 @@ async def render_project(
     
     Rendering is free (no additional credits), but still tracks the user.
     """
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
     # Log who initiated the render (for analytics)
     if billing.user:
         logger.info(f"User {billing.user.id} started render for {project_id}")
     
-    background.add_task(pipeline_service.render_only, project_id)
+    background.add_task(_run_limited, pipeline_service.render_only, project_id)
     
     return RunResponse(status="OK", message="Render started")
 
 
-@router.get("/{project_id}/jobs")
-async def get_jobs(project_id: str) -> dict[str, Any]:
+@router.get("/{project_id}/jobs", response_model=None)
+async def get_jobs(project_id: str) -> ORJSONResponse:
     """Get job statuses."""
-    jobs = project_repo.get_jobs(project_id)
+    jobs = project_repo.load_bundle(project_id).jobs
     if not jobs:
         raise HTTPException(status_code=404, detail="Jobs not found")
-    return {"jobs": jobs}
+    return ORJSONResponse({"jobs": jobs})
 
 
 @router.get("/{project_id}/images/{image_name}")
 async def get_image(project_id: str, image_name: str) -> FileResponse:
     """Get a generated image."""
-    image_path = file_storage.get_image_path(project_id, image_name)
-    if not image_path:
+    found = file_storage.stat_image(project_id, image_name)
+    if not found:
         raise HTTPException(status_code=404, detail="Image not found")
-    return FileResponse(image_path)
+    image_path, stat_result = found
+    return FileResponse(image_path, stat_result=stat_result)
 
 
-@router.get("/{project_id}/renders/{render_name}")
-async def get_render(project_id: str, render_name: str):
-    """Serve a rendered video. FastAPI's FileResponse handles Range requests automatically."""
-    render_path = file_storage.get_render_path(project_id, render_name)
-    if not render_path:
-        raise HTTPException(status_code=404, detail="Render not found")
+def _parse_range(header: str, file_size: int) -> tuple[int, int] | None:
+    """Parse a single "bytes=start-end" Range header into inclusive offsets.
     
-    return FileResponse(
-        render_path, 
-        media_type="video/mp4",
-        filename=render_name
+    Returns None when the header is malformed or cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header)
+    if not match:
+        return None
+    
+    start_str, end_str = match.groups()
+    if start_str:
+        start = int(start_str)
+        end = min(int(end_str), file_size - 1) if end_str else file_size - 1
+    elif end_str:
+        # Suffix range: the last N bytes
+        start = max(file_size - int(end_str), 0)
+        end = file_size - 1
+    else:
+        return None
+    
+    if start > end or start >= file_size:
+        return None
+    return start, end
+
+
+def _get_render_meta(project_id: str, render_name: str) -> tuple[Path, os.stat_result] | None:
+    """Resolve a render's path and stat result, cached briefly per render."""
+    key = (project_id, render_name)
+    meta = _RENDER_META.get(key)
+    if meta is None:
+        meta = file_storage.stat_render(project_id, render_name)
+        if meta is None:
+            return None
+        _RENDER_META[key] = meta
+    return meta
+
+
+async def _iter_file_range(path: Path, start: int, end: int) -> AsyncIterator[bytes]:
+    """Stream bytes [start, end] of a file without blocking the event loop."""
+    remaining = end - start + 1
+    offset = start
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, start, remaining, os.POSIX_FADV_SEQUENTIAL)
+        while remaining > 0:
+            # Positional reads: no seek, and the offset is explicit per chunk
+            data = await anyio.to_thread.run_sync(
+                os.pread, fd, min(RENDER_CHUNK_SIZE, remaining), offset
+            )
+            if not data:
+                break
+            offset += len(data)
+            remaining -= len(data)
+            yield data
+    finally:
+        os.close(fd)
+
+
+def _serve_media(
+    request: Request,
+    path: Path,
+    stat_result: os.stat_result,
+    media_type: str,
+    filename: Optional[str] = None,
+) -> Response:
+    """Serve a media file, honouring single byte-range requests for seeking."""
+    file_size = stat_result.st_size
+    range_header = request.headers.get("range")
+    if range_header:
+        byte_range = _parse_range(range_header, file_size)
+        if byte_range is None:
+            raise HTTPException(
+                status_code=416,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{file_size}"},
+            )
+        
+        start, end = byte_range
+        return StreamingResponse(
+            _iter_file_range(path, start, end),
+            status_code=206,
+            media_type=media_type,
+            headers={
+                "Accept-Ranges": "bytes",
+                "Content-Range": f"bytes {start}-{end}/{file_size}",
+                "Content-Length": str(end - start + 1),
+            },
+        )
+    
+    return MediaFileResponse(
+        path,
+        media_type=media_type,
+        filename=filename,
+        stat_result=stat_result,
+        headers={"Accept-Ranges": "bytes"},
     )
 
 
+@router.get("/{project_id}/renders/{render_name}")
+async def get_render(project_id: str, render_name: str, request: Request) -> Response:
+    """Serve a rendered video."""
+    meta = _get_render_meta(project_id, render_name)
+    if not meta:
+        raise HTTPException(status_code=404, detail="Render not found")
+    render_path, stat_result = meta
+    return _serve_media(request, render_path, stat_result, "video/mp4", filename=render_name)
+
+
 @router.get("/{project_id}/download")
-async def download_project_video(project_id: str) -> FileResponse:
+async def download_project_video(project_id: str, request: Request) -> Response:
     """Download the latest rendered video."""
     video_path = file_storage.get_latest_render(project_id)
     if not video_path:
         raise HTTPException(status_code=404, detail="Video not found")
     
-    return FileResponse(
-        path=video_path,
-        media_type="video/mp4",
-        filename=video_path.name,
-        headers={"Content-Type": "video/mp4"},
-    )
+    return _serve_media(request, video_path, os.stat(video_path), "video/mp4", filename=video_path.name)
 
 
 # ==================== Subtitle Endpoints ====================
 
-@router.post("/{project_id}/subtitles/generate", response_model=SubtitleResponse)
+@router.post("/{project_id}/subtitles/generate", response_model=SubtitleResponse, dependencies=[ProjectDep])
 async def generate_subtitles(
     project_id: str,
     request: SubtitleGenerateRequest = SubtitleGenerateRequest(),
     subtitle_service: SubtitleService = Depends(get_subtitle_service)
 ) -> SubtitleResponse:
     """Generate subtitles from audio using Gemini 3.0 Flash."""
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
     audio_path = file_storage.get_audio_path(project_id)
     if not audio_path:
         raise HTTPException(status_code=400, detail="No audio file uploaded")
     
     # Auto-adjust settings for vertical videos
-    project = project_repo.get(project_id)
-    if project and project.get("format") == "9:16":
+    if project_repo.get_format(project_id) == "9:16":
         # For vertical videos, we limit max words to 5 for better readability
         # unless the user specifically requested a very small number (which is unlikely to be < 5 anyway)
         # But here we enforce the max limit of 5 as requested.
@@ -607,41 +761,40 @@ async def generate_subtitles(
             logger.info(f"Auto-adjusting max_words from {request.max_words} to 5 for vertical video (9:16)")
             request.max_words = 5
     
-    from fastapi.concurrency import run_in_threadpool
-    
-    try:
-        entries = await run_in_threadpool(
-            subtitle_service.transcribe_audio,
-            project_id=project_id,
-            language=request.language,
-            min_words=request.min_words,
-            max_words=request.max_words,
-        )
-        
-        # Get styling (default or existing)
-        styling_dict = file_storage.get_subtitle_styling(project_id)
-        styling = SubtitleStyling(**(styling_dict or {}))
-        
-        return SubtitleResponse(
-            entries=entries,
-            styling=styling,
-            srt_content=subtitle_service.get_srt_content(project_id),
-        )
-    except Exception as e:
-        logger.error(f"Subtitle generation failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Subtitle generation failed: {str(e)}")
+    async with _interactive_slot():
+        try:
+            # Styling is stored independently of the transcript, so read it while
+            # transcription runs. If none exists yet, transcription saves the
+            # defaults, which is what an empty read falls back to anyway.
+            entries, styling_dict = await asyncio.gather(
+                run_in_threadpool(
+                    subtitle_service.transcribe_audio,
+                    project_id=project_id,
+                    language=request.language,
+                    min_words=request.min_words,
+                    max_words=request.max_words,
+                ),
+                run_in_threadpool(file_storage.get_subtitle_styling, project_id),
+            )
+            styling = SubtitleStyling(**(styling_dict or {}))
+            
+            return SubtitleResponse(
+                entries=entries,
+                styling=styling,
+                srt_content=await run_in_threadpool(subtitle_service.get_srt_content, project_id),
+            )
+        except Exception as e:
+            logger.error(f"Subtitle generation failed: {e}")
+            raise HTTPException(status_code=500, detail=f"Subtitle generation failed: {str(e)}")
 
 
-@router.post("/{project_id}/subtitles/import", response_model=SubtitleResponse)
+@router.post("/{project_id}/subtitles/import", response_model=SubtitleResponse, dependencies=[ProjectDep])
 async def import_subtitles(
     project_id: str,
     srt_file: UploadFile = File(...),
     subtitle_service: SubtitleService = Depends(get_subtitle_service)
 ) -> SubtitleResponse:
     """Import SRT file."""
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
     if not srt_file.filename or not srt_file.filename.lower().endswith('.srt'):
         raise HTTPException(status_code=400, detail="File must be a .srt file")
     
@@ -665,15 +818,12 @@ async def import_subtitles(
         raise HTTPException(status_code=400, detail=f"Failed to parse SRT file: {str(e)}")
 
 
-@router.get("/{project_id}/subtitles", response_model=SubtitleResponse)
+@router.get("/{project_id}/subtitles", response_model=SubtitleResponse, dependencies=[ProjectDep])
 async def get_subtitles(
     project_id: str,
     subtitle_service: SubtitleService = Depends(get_subtitle_service)
 ) -> SubtitleResponse:
     """Get current subtitles."""
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
     result = subtitle_service.load_subtitles(project_id)
     if not result:
         # Return empty response if no subtitles exist
@@ -686,16 +836,13 @@ async def get_subtitles(
     return result
 
 
-@router.put("/{project_id}/subtitles", response_model=SubtitleResponse)
+@router.put("/{project_id}/subtitles", response_model=SubtitleResponse, dependencies=[ProjectDep])
 async def update_subtitles(
     project_id: str,
     payload: SubtitleUpdate,
     subtitle_service: SubtitleService = Depends(get_subtitle_service)
 ) -> SubtitleResponse:
     """Update subtitle entries and/or styling."""
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
     if payload.entries is not None:
         subtitle_service.update_entries(project_id, payload.entries)
     
@@ -714,58 +861,79 @@ async def update_subtitles(
     return result
 
 
-@router.get("/{project_id}/subtitles/download")
+@router.get("/{project_id}/subtitles/download", dependencies=[ProjectDep])
 async def download_srt(project_id: str) -> FileResponse:
     """Download SRT file."""
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
     srt_path = file_storage.get_subtitles_path(project_id)
     if not srt_path:
         raise HTTPException(status_code=404, detail="Subtitles not found")
     
     return FileResponse(
         path=srt_path,
-        media_type="application/x-subrip",
+        media_type="text/plain; charset=utf-8",
         filename="subtitles.srt",
-        headers={"Content-Type": "text/plain; charset=utf-8"},
     )
 
 
-@router.delete("/{project_id}/subtitles")
+@router.delete("/{project_id}/subtitles", dependencies=[ProjectDep])
 async def delete_subtitles(
     project_id: str,
     subtitle_service: SubtitleService = Depends(get_subtitle_service)
 ) -> dict[str, str]:
     """Delete all subtitles for a project."""
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
     subtitle_service.delete_subtitles(project_id)
     return {"status": "OK", "message": "Subtitles deleted"}
 
 
-@router.get("/meta/fonts")
-async def list_fonts() -> dict[str, Any]:
+_FONTS_BODY = orjson.dumps({
+    "fonts": [f.model_dump() for f in get_available_fonts()],
+    "total": len(get_available_fonts()),
+})
+
+
+@router.get("/meta/fonts", response_model=None)
+async def list_fonts() -> Response:
     """Get list of available fonts for subtitles."""
-    fonts = get_available_fonts()
-    return {
-        "fonts": [f.model_dump() for f in fonts],
-        "total": len(fonts),
-    }
+    return _json_body(_FONTS_BODY)
 
 
 # ==================== Standalone Video Endpoints ====================
 
-@router.post("/{project_id}/upload-video", response_model=RunResponse)
+# Admission control for ffmpeg: at most half the cores' worth of concurrent
+# processes, each told to use its share of threads, so parallel uploads
+# can't oversubscribe the CPU.
+_CPU_COUNT = os.cpu_count() or 2
+_FFMPEG_SLOTS = asyncio.Semaphore(max(1, _CPU_COUNT // 2))
+_FFMPEG_THREADS = str(max(1, _CPU_COUNT // max(1, _CPU_COUNT // 2)))
+
+
+async def _run_ffmpeg(args: list[str]) -> None:
+    """Run ffmpeg (args ending in the output path) once a slot is free, raising CalledProcessError on failure."""
+    # Before -i it would only apply to decoding; as an output option it caps encoding and filtering
+    args = [*args[:-1], "-threads", _FFMPEG_THREADS, args[-1]]
+    async with _FFMPEG_SLOTS:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "ffmpeg", *args,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except NotImplementedError:
+            # Event loops without subprocess support (e.g. the Windows selector loop)
+            await asyncio.to_thread(subprocess.run, ["ffmpeg", *args], capture_output=True, check=True)
+            return
+        
+        _, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, "ffmpeg", stderr=stderr)
+
+
+@router.post("/{project_id}/upload-video", response_model=RunResponse, dependencies=[ProjectDep])
 async def upload_video_standalone(
     project_id: str,
     video: UploadFile = File(...)
 ) -> RunResponse:
     """Upload video for standalone subtitle mode."""
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
     # Validate video format
     valid_types = ['video/mp4', 'video/quicktime', 'video/webm', 'video/avi', 'video/x-msvideo']
     if video.content_type not in valid_types:
@@ -774,17 +942,20 @@ async def upload_video_standalone(
     project_repo.ensure_dirs(project_id)
     
     # Save video to project
-    video_path = file_storage.save_video(project_id, video.file, video.filename or "video.mp4")
+    video_path = await file_storage.save_video_stream(
+        project_id, video, video.filename or "video.mp4"
+    )
     
-    # Also extract audio for transcription
+    # Also extract audio for transcription. The track is only used for
+    # speech recognition, so 16 kHz mono is plenty and much cheaper to write.
     try:
-        import subprocess
         audio_path = video_path.parent / "track.wav"
-        subprocess.run([
-            "ffmpeg", "-y", "-i", str(video_path),
-            "-vn", "-acodec", "pcm_s16le", "-ar", "44100", "-ac", "2",
+        await _run_ffmpeg([
+            "-y", "-nostdin", "-i", str(video_path),
+            "-map", "0:a:0", "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1",
+            "-af", "aresample=async=1:first_pts=0",
             str(audio_path)
-        ], capture_output=True, check=True)
+        ])
         logger.info(f"Extracted audio to {audio_path}")
     except Exception as e:
         logger.warning(f"Could not extract audio from video: {e}")
@@ -794,16 +965,13 @@ async def upload_video_standalone(
     return RunResponse(status="OK", message="Video uploaded")
 
 
-@router.post("/{project_id}/render-standalone", response_model=RunResponse)
+@router.post("/{project_id}/render-standalone", response_model=RunResponse, dependencies=[ProjectDep])
 async def render_standalone(
     project_id: str,
     background: BackgroundTasks,
     pipeline_service: PipelineService = Depends(get_pipeline_service)
 ) -> RunResponse:
     """Render video with subtitles only (standalone mode)."""
-    if not project_repo.exists(project_id):
-        raise HTTPException(status_code=404, detail="Project not found")
-    
     video_path = file_storage.get_video_path(project_id)
     if not video_path:
         raise HTTPException(status_code=400, detail="No video uploaded")
@@ -813,14 +981,14 @@ async def render_standalone(
         raise HTTPException(status_code=400, detail="No subtitles available")
     
     async def render_with_subtitles():
-        from ..services.render_service import RenderService
         render_service = RenderService(project_repo, file_storage)
         
         project_repo.update_job(project_id, "render", {"status": "RUNNING", "progress": 0})
         
         try:
             # Use standard render with video source instead of segments
-            output_path, duration = render_service.render_standalone_video(
+            output_path, duration = await run_in_threadpool(
+                render_service.render_standalone_video,
                 project_id=project_id,
                 video_path=video_path,
             )
@@ -839,7 +1007,7 @@ async def render_standalone(
                 "message": str(e)
             })
     
-    background.add_task(render_with_subtitles)
+    background.add_task(_run_limited, render_with_subtitles)
     
     return RunResponse(status="OK", message="Standalone render started")
 
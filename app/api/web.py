@@ -1,11 +1,17 @@
 """Web routes for serving frontend."""
 from __future__ import annotations
 
-import json
+import asyncio
+import os
+import re
+import time
 from pathlib import Path
 from typing import List, Optional
 
+import orjson
+
 from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 
@@ -13,6 +19,15 @@ from ..core.config import settings
 
 router = APIRouter(tags=["web"])
 
+# Auto-discovered showcase results are reused for this many seconds outright
+SHOWCASE_TTL_SECONDS = 30.0
+# Directory mtimes are tick-granular; don't trust a key younger than this
+_RACY_WINDOW_NS = 1_000_000_000
+# With more project folders than this, only the most recently touched
+# SHOWCASE_SCAN_LIMIT are considered; the landing page needs just a few.
+SHOWCASE_SCAN_CAP = 200
+SHOWCASE_SCAN_LIMIT = 50
+
 
 class ShowcaseItem(BaseModel):
     """A showcase video item for the landing page."""
@@ -24,57 +39,97 @@ class ShowcaseItem(BaseModel):
     thumbnail_url: Optional[str] = None
 
 
-@router.get("/")
-async def index() -> FileResponse:
-    """Serve the main HTML page."""
-    return FileResponse(settings.frontend_dir / "index.html")
+_RENDER_NAME_RE = re.compile(r"final_v(\d+)\.mp4")
+_PREVIEW_NAME_RE = re.compile(r"seg_.*_v.*\.png")
 
+# (checked at, invalidation key, items) for the auto-discovered showcase
+_SHOWCASE_CACHE: tuple[float, Optional[tuple], List[ShowcaseItem]] = (0.0, None, [])
+# Concurrent requests wait for one scan instead of each walking the disk
+_SHOWCASE_LOCK = asyncio.Lock()
 
-@router.get("/showcase", response_model=List[ShowcaseItem])
-async def get_showcase_videos() -> List[ShowcaseItem]:
+
+def _showcase_key(projects_dir: Path) -> tuple[List[tuple[int, Path]], tuple]:
     """
-    Get a list of showcase videos for the landing page.
+    List project folders and build a cheap invalidation key from their mtimes.
     
-    Returns up to 6 completed projects with rendered videos.
+    Project writes replace files inside the folder and new renders land in
+    renders/, so either directory's mtime moving means the scan is stale.
     """
-    showcase_items = []
-    projects_dir = settings.data_dir
-    
-    showcase_file = settings.data_dir.parent / "showcase.json"
-    if showcase_file.exists():
-        try:
-            with open(showcase_file, "r", encoding="utf-8") as f:
-                items = json.load(f)
-                return [ShowcaseItem(**item) for item in items]
-        except Exception:
-            pass  # Fallback to auto discovery if file is invalid
+    folders = []
+    latest = 0
+    with os.scandir(projects_dir) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            mtime = 0
+            try:
+                mtime = entry.stat().st_mtime_ns
+                mtime = max(mtime, os.stat(os.path.join(entry.path, "renders")).st_mtime_ns)
+            except OSError:
+                pass
+            folders.append((mtime, Path(entry.path)))
+            latest = max(latest, mtime)
+    return folders, (os.stat(projects_dir).st_mtime_ns, len(folders), latest)
+
+
+def _latest_render_name(renders_dir: Path) -> Optional[str]:
+    """Name of the highest-versioned final_v*.mp4 render, in one directory pass."""
+    best_version, best_name = -1, None
+    with os.scandir(renders_dir) as entries:
+        for entry in entries:
+            match = _RENDER_NAME_RE.fullmatch(entry.name)
+            if match and int(match.group(1)) > best_version:
+                best_version, best_name = int(match.group(1)), entry.name
+    return best_name
+
+
+def _first_preview_name(images_dir: Path) -> Optional[str]:
+    """Alphabetically first seg_*_v*.png image, or None."""
+    first = None
+    with os.scandir(images_dir) as entries:
+        for entry in entries:
+            if _PREVIEW_NAME_RE.fullmatch(entry.name) and (first is None or entry.name < first):
+                first = entry.name
+    return first
+
+
+def _discover_showcase(projects_dir: Path) -> List[ShowcaseItem]:
+    """Find up to 6 completed projects with renders, reusing the last scan if unchanged."""
+    global _SHOWCASE_CACHE
+    checked_at, cached_key, cached_items = _SHOWCASE_CACHE
+    now = time.monotonic()
+    # Another request may have refreshed the cache while this one waited
+    if cached_key is not None and now - checked_at < SHOWCASE_TTL_SECONDS:
+        return cached_items
     
-    if not projects_dir.exists():
+    try:
+        project_folders, key = _showcase_key(projects_dir)
+    except FileNotFoundError:
         return []
     
+    if key == cached_key:
+        _SHOWCASE_CACHE = (now, key, cached_items)
+        return cached_items
+    
+    if len(project_folders) > SHOWCASE_SCAN_CAP:
+        project_folders.sort(key=lambda folder: folder[0], reverse=True)
+        del project_folders[SHOWCASE_SCAN_LIMIT:]
+    
+    showcase_items = []
     # Scan for projects with completed renders
-    for project_folder in projects_dir.iterdir():
-        if not project_folder.is_dir():
-            continue
-            
+    for _, project_folder in project_folders:
         project_json = project_folder / "project.json"
-        renders_dir = project_folder / "renders"
-        
-        if not project_json.exists() or not renders_dir.exists():
-            continue
         
         # Find the latest render
-        renders = list(renders_dir.glob("final_v*.mp4"))
-        if not renders:
+        try:
+            latest_render = _latest_render_name(project_folder / "renders")
+        except FileNotFoundError:
+            continue
+        if not latest_render:
             continue
-            
-        # Sort by version number to get the latest
-        renders.sort(key=lambda x: int(x.stem.split("_v")[1]), reverse=True)
-        latest_render = renders[0]
         
         try:
-            with open(project_json, "r", encoding="utf-8") as f:
-                project_data = json.load(f)
+            project_data = orjson.loads(project_json.read_bytes())
         except Exception:
             continue
         
@@ -94,21 +149,21 @@ async def get_showcase_videos() -> List[ShowcaseItem]:
             title = f"Video #{len(showcase_items) + 1}"
         
         # Check for a preview image
-        images_dir = project_folder / "images"
         thumbnail_url = None
-        if images_dir.exists():
-            preview_images = list(images_dir.glob("seg_*_v*.png"))
-            if preview_images:
-                # Get first segment's latest version as thumbnail
-                preview_images.sort()
-                thumbnail_url = f"/projects/{project_id}/images/{preview_images[0].name}"
+        try:
+            # Get first segment's latest version as thumbnail
+            preview_image = _first_preview_name(project_folder / "images")
+        except FileNotFoundError:
+            preview_image = None
+        if preview_image:
+            thumbnail_url = f"/projects/{project_id}/images/{preview_image}"
         
         showcase_items.append(ShowcaseItem(
             id=project_id,
             title=title,
             format=project_data.get("format", "16:9"),
             style=project_data.get("style", "cinematic"),
-            video_url=f"/projects/{project_id}/renders/{latest_render.name}",
+            video_url=f"/projects/{project_id}/renders/{latest_render}",
             thumbnail_url=thumbnail_url
         ))
         
@@ -116,4 +171,37 @@ async def get_showcase_videos() -> List[ShowcaseItem]:
         if len(showcase_items) >= 6:
             break
     
+    if time.time_ns() - key[-1] > _RACY_WINDOW_NS:
+        _SHOWCASE_CACHE = (now, key, showcase_items)
     return showcase_items
+
+
+@router.get("/")
+async def index() -> FileResponse:
+    """Serve the main HTML page."""
+    return FileResponse(settings.frontend_dir / "index.html")
+
+
+@router.get("/showcase", response_model=List[ShowcaseItem])
+async def get_showcase_videos() -> List[ShowcaseItem]:
+    """
+    Get a list of showcase videos for the landing page.
+    
+    Returns up to 6 completed projects with rendered videos.
+    """
+    projects_dir = settings.data_dir
+    
+    showcase_file = settings.data_dir.parent / "showcase.json"
+    if showcase_file.exists():
+        try:
+            items = orjson.loads(showcase_file.read_bytes())
+            return [ShowcaseItem(**item) for item in items]
+        except Exception:
+            pass  # Fallback to auto discovery if file is invalid
+    
+    checked_at, cached_key, cached_items = _SHOWCASE_CACHE
+    if cached_key is not None and time.monotonic() - checked_at < SHOWCASE_TTL_SECONDS:
+        return cached_items
+    
+    async with _SHOWCASE_LOCK:
+        return await run_in_threadpool(_discover_showcase, projects_dir)
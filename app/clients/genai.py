@@ -1,20 +1,417 @@
 """Google GenAI client for text and image generation."""
 from __future__ import annotations
 
+import hashlib
 import json
-import re
+import logging
+import os
+import random
+import string
+import threading
 import time
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
 from google import genai
-from google.genai import types
+from google.genai import _api_client, types
+from google.genai import version as _genai_version
 
 from ..core.config import settings
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
 
+_http_session: requests.Session | None = None
+_http_session_lock = threading.Lock()
+
+
+def _shared_http_session() -> requests.Session:
+    """One keep-alive session per process, sized for concurrent pipelines."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            pool_size = max(10, settings.genai_max_concurrency * settings.max_concurrent_generations)
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+
+class _PooledRequests:
+    """
+    Stand-in for `requests` inside google-genai's API client.
+    
+    The SDK (0.8) builds a new requests.Session for every API-key call and
+    download, paying a fresh TCP + TLS handshake each time; this hands it
+    the shared pooled session instead.
+    """
+    Session = staticmethod(_shared_http_session)
+
+
+# The stand-in only provides `Session`, so it is installed solely on the SDK
+# release it was checked against; other versions keep their own `requests`.
+_POOLED_SDK_VERSION = "0.8.0"
+
+if (
+    _genai_version.__version__ == _POOLED_SDK_VERSION
+    and getattr(_api_client, "requests", None) is requests
+):
+    _api_client.requests = _PooledRequests
+else:
+    logger.debug(
+        "Not pooling google-genai HTTP sessions (SDK %s, patch verified on %s)",
+        _genai_version.__version__,
+        _POOLED_SDK_VERSION,
+    )
+
+
+@lru_cache(maxsize=16)
+def _sdk_client(api_key: str | None) -> genai.Client:
+    """One SDK client per API key, shared by every service's GenAIClient."""
+    return genai.Client(api_key=api_key)
+
+
+# Replayed text-model answers (see settings.genai_response_cache_ttl)
+RESPONSE_CACHE_DIR = settings.base_dir / "data" / "genai_cache"
+
+# Uploaded Gemini files by (api_key, path, size, mtime_ns), most recent last
+UPLOAD_CACHE_SIZE = 32
+_upload_cache: OrderedDict[tuple, str] = OrderedDict()
+_upload_cache_lock = threading.Lock()
+
+
+_SUBTITLE_SYSTEM_TEMPLATE = string.Template("""\
+You are an expert lyrics synchronizer and audio transcriber suitable for karaoke creation. Your task is to generate precise, synchronized subtitles for the provided SONG audio.
+
+LANGUAGE INSTRUCTION: $language_instruction
+
+TIMING & FORMATTING (CRITICAL FOR MUSIC):
+1. Precision (Vocal Attack): The "start" time must correspond exactly to the millisecond the vocal cords engage (the attack of the first syllable). Do not include the instrumental intro breath before the word.
+2. End Times: The "end" time must mark exactly where the vocal stops. Do not extend the segment into the instrumental tail or reverb.
+3. Instrumental Sections: If there are instrumental solos, breaks, or intros/outros with NO vocals, do NOT generate any segments. Leave gaps in the timeline.
+4. Format: Use standard SRT time format HH:MM:SS,mmm. ALWAYS include milliseconds and use a COMMA (,) as the separator.
+
+TEXT & SEGMENTATION RULES:
+1. Lyrical Phrasing: Segment the text based on MUSICAL PHRASING and lyrical lines, not just sentence structure.
+   - It is acceptable to have short segments (e.g., 1-2 words) if they act as a distinct call-out or ad-lib.
+   - Do NOT break a continuous sung phrase in the middle just to satisfy word counts unless it is extremely long (>10 seconds).
+2. Constraints:
+   - Target roughly $min_words to $max_words words per segment, BUT prioritize the natural rhythm of the song.
+3. Content: Transcribe ONLY spoken/sung words. 
+   - NO non-verbal tags like [Music], [Guitar Solo], [Applause].
+   - Include ad-libs (e.g., "Yeah", "Ooh") and background vocals if they are prominent.
+4. Acoustic Truth: Transcribe exactly what is heard in THIS audio file. Do not correct grammar or insert lyrics from the original studio version if the singer skips them or changes them in this recording.
+
+### ONE-SHOT EXAMPLE (Strictly follow this JSON format and logic):
+
+Input: [Audio of a song with a pause between lines]
+Output:
+[
+  {
+    "start": "00:00:12,450",
+    "end": "00:00:14,200",
+    "text": "Is this the real life?"
+  },
+  {
+    "start": "00:00:14,300",
+    "end": "00:00:16,100",
+    "text": "Is this just fantasy?"
+  },
+  {
+    "start": "00:00:19,500",
+    "end": "00:00:22,000",
+    "text": "Caught in a landslide"
+  }
+]
+(Note: Notice the gap between 16,100 and 19,500 where instrumental music plays – no segment is generated there).
+
+OUTPUT FORMAT: 
+Return a strictly valid JSON array matching the schema above.
+Do not wrap the JSON in markdown blocks (no ```json). Return raw JSON string only.
+""")
+
+
+_ANALYZE_AUDIO_TEMPLATE = string.Template("""\
+Analyze the audio track in this song to create a PROFESSIONAL music video plan.
+The total duration of the audio is $duration seconds.
+
+USER REQUEST / PLOT DESCRIPTION:
+"$user_description"
+(The narrative, metaphors, and events MUST follow this description if provided. If empty, invent a creative one).
+
+The user has requested the visual style: "$user_style".
+
+CHARACTER DESCRIPTION:
+"$character_description"
+(If provided, this character MUST be the protagonist of the video).
+
+$tech_context
+
+EDITING RULES (CRITICAL):
+1. RHYTHM IS KING: Cut to the beat. Visuals must sync with the audio.
+2. SONG STRUCTURE: You MUST identify the sections: Intro, Verse, Pre-Chorus, Chorus, Bridge, Outro.
+3. PACING BY SECTION:
+   - Verses: Longer, cinematic shots. Focus on storytelling.
+   - Choruses: FAST cuts. Short, rhythmic clips. "Micro-series" of shots on beats. High energy.
+   - Transitions: 1-2 distinct "accent" shots with strong movement/impact.
+4. MARKERS: Place keyframes on strong beats (kick/snare, drops).
+
+Please provide:
+1. A summary of the song's energy, mood, and style.
+2. A "global_visual_narrative": A single, cohesive visual metaphor or story concept.
+   - MUST be a concrete visual idea (e.g. "A cyberpunk detective walking through neon rain", NOT just "A journey of self-discovery").
+   - Should evolve from beginning to end.
+3. A "visual_style_anchor": A specific, consistent visual style description BASED ON "$user_style".
+   - Include lighting, color palette, and texture (e.g. "Cinematic lighting, teal and orange palette, film grain").
+4. A "video_plan": A structured plan containing "scenes".
+
+"video_plan" structure:
+{
+  "scenes": [
+    {
+      "start_time": float,
+      "end_time": float,
+      "section_type": "Intro" | "Verse" | "Chorus" | "Bridge" | "Outro",
+      "description": "Visual description of the scene",
+      "energy_level": float (0.0 to 1.0),
+      "keyframes": [
+        {
+          "time": float,
+          "type": "cut" | "zoom" | "shake" | "beat",
+          "description": "Short note",
+          "parameters": {}
+        }
+      ]
+    }
+  ]
+}
+
+Instructions for Scenes:
+- Segments have NO GAPS and NO OVERLAPS.
+- Cover exactly 0.0 to $duration.
+- The pacing MUST follow the structure (Verse=Slow, Chorus=Fast).
+- Use the technical analysis (Drops, Downbeats) to align scene changes and keyframes.
+
+Return as a JSON object with keys: "summary", "global_visual_narrative", "visual_style_anchor", "video_plan", "segments" (legacy support, map scenes to segments if needed or keep separate).
+""")
+
+
+_STORYBOARD_TEMPLATE = string.Template("""\
+Based on this analysis: $analysis
+
+Create a storyboard as a JSON list of segments.
+The total duration MUST be EXACTLY $total_duration seconds.
+
+Follow the "global_visual_narrative" defined in the analysis. The video must feel like a cohesive film with a clear Narrative Arc (Beginning, Development, Climax).
+
+VISUAL STORYTELLING:
+- Don't just list random images. Connect them.
+- Use cinematographic terms (Wide Shot, Close Up, Dolly Zoom, Tracking Shot).
+- Describe lighting and movement in EVERY segment.
+
+PACING & RHYTHM RULES (STRICT):
+1. RHYTHM IS KING: Align cuts with the music's rhythm.
+2. VERSES / INTRO = Cinematic, Longer Shots (4-8s). Focus on storytelling and establishing atmosphere.
+3. CHORUSES / DROPS = Fast Cuts, High Energy (0.5s-2s). Flash different angles/actions on beats. "Micro-series" of shots.
+4. TRANSITIONS = Accent shots (fast zooms/whips) on section changes.
+5. Match the "energy_level" of the music. If the rhythm "sits", even simple pan/zoom looks professional.
+
+Each segment MUST have:
+- id: a unique string like "seg_1", "seg_2", etc.
+- start_time: "MM:SS" (or total seconds)
+- end_time: "MM:SS" (or total seconds)
+- lyric_text: the transcript for this segment
+- visual_intent: a detailed description of what should be on screen, following the global narrative and current intensity.
+- camera_angle: suggested camera shot (e.g. "Close-up", "Wide shot", "Drone shot")
+- emotion: the detected emotion
+- effect: "zoom_in" | "zoom_out" | "pan_left" | "pan_right" | "pan_up" | "pan_down" (Verse = smooth pans, Chorus = fast zooms)
+- transition: "cut" | "crossfade" | "slide_left" | "slide_right" | "zoom_in" (High Energy = slide/zoom, Low Energy = crossfade)
+
+IMPORTANT: The segments MUST tile the entire $total_duration seconds. 
+The first segment must start at 00:00. 
+The last segment must end at $total_duration.
+No gaps, no overlaps.
+
+Return ONLY the JSON list.
+""")
+
+
+_IMAGE_PROMPTS_TEMPLATE = string.Template("""\
+For each of these segments, create a detailed image generation prompt.
+
+Global Style Anchor: "$style_anchor" 
+(YOU MUST APPEND THIS EXACT STYLE DESCRIPTION TO EVERY SINGLE PROMPT TO ENSURE CONSISTENCY).
+
+QUALITY BOOSTERS (Include these invisibly in the style):
+"8k resolution, cinematic lighting, photorealistic, intricate detail, sharp focus, masterpiece"
+(Unless the user style explicitly contradicts this, e.g. "pixel art").
+
+CHARACTER CONSISTENCY:
+Character Description: "$character_description"
+(If the character appears, they MUST match this description. If the scene allows, feature this character).
+
+Segments: $segments
+
+Return a JSON object where keys are the segment IDs ("seg_1", etc.) and values are objects containing:
+- image_prompt: the detailed prompt for the AI image generator. MUST include the Style Anchor and Visual Intent.
+- negative_prompt: "blurry, low quality, distorted, bad anatomy, text, watermark, signature, ugly"
+- style_hints: keywords about the style (optional)
+
+Return ONLY the JSON object.
+""")
+
+
+@lru_cache(maxsize=1)
+def _subtitle_config() -> types.GenerateContentConfig:
+    """
+    Static part of the subtitle request config, built once.
+    
+    The SDK only dumps the config before sending, so callers can share it
+    through a shallow model_copy that adds the per-call system instruction.
+    """
+    return types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=types.Schema(
+            type=types.Type.ARRAY,
+            items=types.Schema(
+                type=types.Type.OBJECT,
+                required=["text", "start", "end"],
+                properties={
+                    "text": types.Schema(type=types.Type.STRING),
+                    "start": types.Schema(type=types.Type.STRING),
+                    "end": types.Schema(type=types.Type.STRING),
+                },
+            ),
+        ),
+        temperature=0.0,
+        max_output_tokens=8192,
+    )
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Cut long log bodies, noting how much was dropped."""
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]} ... <truncated, total {len(text)} chars>"
+
+
+def _prompt_json(data: Any) -> str:
+    """Compact JSON for embedding data in a prompt."""
+    return orjson.dumps(
+        data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS, default=str
+    ).decode()
+
+
+def _canonical_json(data: Any) -> bytes:
+    """Key-order independent JSON bytes, for hashing."""
+    return orjson.dumps(
+        data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY, default=str
+    )
+
+
+def _response_cache_path(model: str, contents: list[Any]) -> Path | None:
+    """Location of the cached answer for a request, or None when caching is off."""
+    if settings.genai_response_cache_ttl <= 0:
+        return None
+    # Uploaded files are identified by URI; the upload cache keeps it stable
+    parts = [
+        part if isinstance(part, (str, dict, list)) else getattr(part, "uri", None) or repr(part)
+        for part in contents
+    ]
+    digest = hashlib.blake2b(_canonical_json([model, parts]), digest_size=20).hexdigest()
+    return RESPONSE_CACHE_DIR / digest[:2] / f"{digest[2:]}.json"
+
+
+def _read_cached_response(path: Path) -> Any | None:
+    """Load a cached answer if it exists and is within the TTL."""
+    try:
+        if time.time() - path.stat().st_mtime > settings.genai_response_cache_ttl:
+            return None
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def _write_cached_response(path: Path, data: Any) -> None:
+    """Store an answer atomically; caching failures are not fatal."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(orjson.dumps(data))
+        os.replace(tmp_path, path)
+    except (OSError, TypeError) as e:
+        logger.warning("Failed to cache Gemini response: %s", e)
+
+
+_DECODER = json.JSONDecoder()
+_CLOSERS = {"[": "]", "{": "}"}
+
+
+def _strip_code_fence(text: str) -> str:
+    """Return the body of the first ``` fenced block, or the text unchanged."""
+    _, fence, rest = text.partition("```")
+    if not fence:
+        return text
+    body, fence, _ = rest.partition("```")
+    if not fence:
+        return text
+    if body.startswith("json"):
+        body = body[4:]
+    return body
+
+
+def _next_json_start(text: str, pos: int) -> int:
+    """Index of the next '[' or '{' at or after pos, or -1."""
+    starts = [i for i in (text.find("[", pos), text.find("{", pos)) if i != -1]
+    return min(starts) if starts else -1
+
+
+def _decode_truncated(text: str) -> Any:
+    """
+    Decode JSON cut off mid-output, in one pass over the text: drop the
+    incomplete trailing element and append the missing closers.
+    """
+    stack: list[str] = []
+    in_string = escaped = False
+    # Longest prefix ending on a complete value nested inside an open container
+    cut, cut_stack = None, None
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(ch)
+        elif ch in "]}":
+            if not stack:
+                break
+            stack.pop()
+            if stack:
+                cut, cut_stack = i + 1, list(stack)
+    
+    # A list of scalars cut between items ("[1, 2, 3") only needs closing
+    if stack and stack[-1] == "[" and not in_string:
+        try:
+            return _DECODER.decode(text.rstrip().rstrip(",") + "".join(_CLOSERS[c] for c in reversed(stack)))
+        except json.JSONDecodeError:
+            pass
+    if cut is None:
+        raise ValueError("Could not extract valid JSON")
+    return _DECODER.decode(text[:cut] + "".join(_CLOSERS[c] for c in reversed(cut_stack)))
+
 
 class GenAIClient:
     """Client for Google Generative AI (Gemini)."""
@@ -31,7 +428,7 @@ class GenAIClient:
         self.image_model = image_model or settings.genai_image_model
         self.subtitle_model = subtitle_model or settings.genai_subtitle_model
         
-        self._client = genai.Client(api_key=self.api_key)
+        self._client = _sdk_client(self.api_key)
         
         if self.api_key:
             logger.info("GenAI client initialized (API key length: %d)", len(self.api_key))
@@ -40,101 +437,155 @@ class GenAIClient:
     
     def _log_interaction(self, method: str, request: Any, response: Any) -> None:
         """Log request and response from Gemini."""
+        if not logger.isEnabledFor(logging.INFO):
+            return
         try:
             # We don't want to log huge images in the text log
             log_response = response
-            if isinstance(response, bytes):
+            if isinstance(response, (bytes, bytearray, memoryview)):
                 log_response = f"<binary data: {len(response)} bytes>"
             elif hasattr(response, "text"):
                 log_response = response.text
             
-            response_len = len(str(log_response))
-            display_response = str(log_response)
-            if response_len > 2000:
-                display_response = display_response[:2000] + f" ... <truncated, total {response_len} chars>"
-
-            logger.info("-" * 40)
-            logger.info(f"GEMINI INTERACTION: {method}")
-            logger.info(f"REQUEST:\n{request}")
-            logger.info(f"RESPONSE (Length: {response_len}):\n{display_response}")
-            logger.info("-" * 40)
+            request_text = str(request)
+            response_text = str(log_response)
+            limit = settings.log_body_max
+            logger.info(
+                "%s\nGEMINI INTERACTION: %s\nREQUEST:\n%s\nRESPONSE (Length: %d):\n%s\n%s",
+                "-" * 40,
+                method,
+                _truncate(request_text, limit),
+                len(response_text),
+                _truncate(response_text, limit),
+                "-" * 40,
+            )
         except Exception as e:
             logger.error(f"Failed to log interaction: {e}")
 
     def _extract_json(self, text: str) -> Any:
         """Extract JSON from model response text."""
         try:
-            # 1. Try to find JSON in code blocks
-            match = re.search(r"```(?:json)?\s*(.*?)\s*```", text, re.DOTALL)
-            if match:
-                text = match.group(1)
+            # 1. Unwrap a ```json ... ``` code block
+            text = _strip_code_fence(text).strip()
             
-            text = text.strip()
-            
-            # 2. Simple attempt
+            # Fast path: structured output is usually a bare JSON document
             try:
-                return json.loads(text)
-            except json.JSONDecodeError:
+                return orjson.loads(text)
+            except orjson.JSONDecodeError:
                 pass
             
-            # 3. Handle Truncated List: Starts with [ but doesn't end with ]
-            if text.startswith("[") and not text.endswith("]"):
-                # Try appending ]
+            # 2. Decode the first JSON value, skipping any prose before it
+            #    (including stray brackets in that prose, e.g. "Note {x}: [...]")
+            start = _next_json_start(text, 0)
+            while True:
+                if start == -1:
+                    raise ValueError("Could not extract valid JSON")
                 try:
-                    return json.loads(text + "]")
-                except json.JSONDecodeError:
-                    pass
-                # Try removing trailing comma/junk and appending ]
-                # Find the last closing brace }
-                last_brace = text.rfind("}")
-                if last_brace != -1:
-                    truncated = text[:last_brace+1] + "]"
-                    try:
-                        return json.loads(truncated)
-                    except json.JSONDecodeError:
-                        pass
-
-            # 4. Regex fallback (be careful with {})
-            # Prefer full array match
-            match = re.search(r"(\[.*\])", text, re.DOTALL)
-            if match:
-                return json.loads(match.group(1))
+                    data, end = _DECODER.raw_decode(text, start)
+                    break
+                except json.JSONDecodeError as e:
+                    if e.pos >= len(text) or e.msg.startswith("Unterminated string"):
+                        # 3. Truncated output: close whatever is still open
+                        return _decode_truncated(text[start:])
+                start = _next_json_start(text, start + 1)
             
-            # 5. Regex for object
-            match = re.search(r"({.*})", text, re.DOTALL)
-            if match:
-                return json.loads(match.group(1))
-            
-            # 6. If it looks like a list content "obj}, {obj", wrap it
-            if "},{" in text:
-                # Try to wrap in brackets
+            # 4. List items without the enclosing brackets: "{...}, {...}"
+            if isinstance(data, dict) and text[end:].lstrip().startswith(","):
                 try:
-                    return json.loads(f"[{text}]")
+                    return _DECODER.decode(f"[{text[start:]}]")
                 except json.JSONDecodeError:
                     pass
-            
-            raise ValueError("Could not extract valid JSON")
+            return data
             
         except Exception as e:
             logger.error(f"Failed to parse JSON from response: {e}")
             return {"error": "Failed to parse JSON", "raw": text}
     
+    def _generate_json(self, method: str, contents: list[Any]) -> Any:
+        """Run a text-model request and parse its JSON, replaying cached answers if enabled."""
+        cache_path = _response_cache_path(self.text_model, contents)
+        if cache_path is not None:
+            cached = _read_cached_response(cache_path)
+            if cached is not None:
+                logger.info("Using cached Gemini response for %s", method)
+                return cached
+        
+        response = self._client.models.generate_content(
+            model=self.text_model,
+            contents=contents
+        )
+        self._log_interaction(method, contents, response)
+        data = self._extract_json(response.text)
+        
+        # Never replay a parse failure; a retry should get a fresh answer
+        if cache_path is not None and not (isinstance(data, dict) and "error" in data):
+            _write_cached_response(cache_path, data)
+        return data
+    
+    def _wait_for_file(
+        self,
+        file_ref: Any,
+        initial: float = 0.25,
+        cap: float = 8.0,
+        timeout: float = 300.0,
+    ) -> Any:
+        """Poll an uploaded file until it leaves PROCESSING, backing off exponentially with jitter."""
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while file_ref.state.name == "PROCESSING":
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"File {file_ref.name} still processing after {timeout:.0f}s")
+            time.sleep(min(remaining, cap, initial * 2 ** attempt) * random.uniform(0.5, 1.5))
+            attempt += 1
+            file_ref = self._client.files.get(name=file_ref.name)
+        return file_ref
+    
+    def _cached_upload(self, key: tuple) -> Any | None:
+        """Return a still-ACTIVE file previously uploaded for this key, if any."""
+        with _upload_cache_lock:
+            file_name = _upload_cache.get(key)
+            if file_name is not None:
+                _upload_cache.move_to_end(key)
+        if file_name is None:
+            return None
+        
+        try:
+            file_ref = self._client.files.get(name=file_name)
+        except Exception:
+            file_ref = None
+        if file_ref is not None and file_ref.state.name == "ACTIVE":
+            return file_ref
+        
+        # Expired or failed on Gemini's side: forget it and upload again
+        with _upload_cache_lock:
+            _upload_cache.pop(key, None)
+        return None
+    
     def _upload_file(self, path: Path) -> Any | None:
         """Upload a file to GenAI and wait for processing."""
         try:
+            st = path.stat()
+            key = (self.api_key, str(path.resolve()), st.st_size, st.st_mtime_ns)
+            file_ref = self._cached_upload(key)
+            if file_ref is not None:
+                logger.info("Reusing uploaded file %s for %s", file_ref.name, path)
+                return file_ref
+            
             logger.info(f"Uploading file: {path}")
             # Fix: The SDK expects 'file' instead of 'path'
-            file_ref = self._client.files.upload(file=str(path))
-            
-            # Wait for processing
-            while file_ref.state.name == "PROCESSING":
-                time.sleep(1)
-                file_ref = self._client.files.get(name=file_ref.name)
+            file_ref = self._wait_for_file(self._client.files.upload(file=str(path)))
             
             if file_ref.state.name == "FAILED":
                 logger.error("File processing failed in Gemini.")
                 return None
             
+            with _upload_cache_lock:
+                _upload_cache[key] = file_ref.name
+                _upload_cache.move_to_end(key)
+                while len(_upload_cache) > UPLOAD_CACHE_SIZE:
+                    _upload_cache.popitem(last=False)
+            
             logger.info(f"File uploaded and processed: {file_ref.name}")
             return file_ref
             
@@ -170,55 +621,11 @@ class GenAIClient:
         else:
             language_instruction = "Detect the language automatically and transcribe in the original language."
         
-        system_instruction_text = f"""
-        You are an expert lyrics synchronizer and audio transcriber suitable for karaoke creation. Your task is to generate precise, synchronized subtitles for the provided SONG audio.
-
-        LANGUAGE INSTRUCTION: {language_instruction}
-
-        TIMING & FORMATTING (CRITICAL FOR MUSIC):
-        1. Precision (Vocal Attack): The "start" time must correspond exactly to the millisecond the vocal cords engage (the attack of the first syllable). Do not include the instrumental intro breath before the word.
-        2. End Times: The "end" time must mark exactly where the vocal stops. Do not extend the segment into the instrumental tail or reverb.
-        3. Instrumental Sections: If there are instrumental solos, breaks, or intros/outros with NO vocals, do NOT generate any segments. Leave gaps in the timeline.
-        4. Format: Use standard SRT time format HH:MM:SS,mmm. ALWAYS include milliseconds and use a COMMA (,) as the separator.
-
-        TEXT & SEGMENTATION RULES:
-        1. Lyrical Phrasing: Segment the text based on MUSICAL PHRASING and lyrical lines, not just sentence structure.
-           - It is acceptable to have short segments (e.g., 1-2 words) if they act as a distinct call-out or ad-lib.
-           - Do NOT break a continuous sung phrase in the middle just to satisfy word counts unless it is extremely long (>10 seconds).
-        2. Constraints:
-           - Target roughly {min_words} to {max_words} words per segment, BUT prioritize the natural rhythm of the song.
-        3. Content: Transcribe ONLY spoken/sung words. 
-           - NO non-verbal tags like [Music], [Guitar Solo], [Applause].
-           - Include ad-libs (e.g., "Yeah", "Ooh") and background vocals if they are prominent.
-        4. Acoustic Truth: Transcribe exactly what is heard in THIS audio file. Do not correct grammar or insert lyrics from the original studio version if the singer skips them or changes them in this recording.
-
-        ### ONE-SHOT EXAMPLE (Strictly follow this JSON format and logic):
-
-        Input: [Audio of a song with a pause between lines]
-        Output:
-        [
-          {{
-            "start": "00:00:12,450",
-            "end": "00:00:14,200",
-            "text": "Is this the real life?"
-          }},
-          {{
-            "start": "00:00:14,300",
-            "end": "00:00:16,100",
-            "text": "Is this just fantasy?"
-          }},
-          {{
-            "start": "00:00:19,500",
-            "end": "00:00:22,000",
-            "text": "Caught in a landslide"
-          }}
-        ]
-        (Note: Notice the gap between 16,100 and 19,500 where instrumental music plays – no segment is generated there).
-
-        OUTPUT FORMAT: 
-        Return a strictly valid JSON array matching the schema above.
-        Do not wrap the JSON in markdown blocks (no ```json). Return raw JSON string only.
-        """
+        system_instruction_text = _SUBTITLE_SYSTEM_TEMPLATE.substitute(
+            language_instruction=language_instruction,
+            min_words=min_words,
+            max_words=max_words,
+        )
 
         try:
             logger.info(f"Generating subtitles using model: {self.subtitle_model}")
@@ -236,32 +643,9 @@ class GenAIClient:
                 ),
             ]
 
-            generate_config = types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=types.Schema(
-                    type=types.Type.ARRAY,
-                    items=types.Schema(
-                        type=types.Type.OBJECT,
-                        required=["text", "start", "end"],
-                        properties={
-                            "text": types.Schema(
-                                type=types.Type.STRING,
-                            ),
-                            "start": types.Schema(
-                                type=types.Type.STRING,
-                            ),
-                            "end": types.Schema(
-                                type=types.Type.STRING,
-                            ),
-                        },
-                    ),
-                ),
-                temperature=0.0,
-                max_output_tokens=8192,
-                system_instruction=[
-                    types.Part.from_text(text=system_instruction_text),
-                ],
-            )
+            generate_config = _subtitle_config().model_copy(update={
+                "system_instruction": [types.Part.from_text(text=system_instruction_text)],
+            })
 
             response = self._client.models.generate_content(
                 model=self.subtitle_model,
@@ -330,71 +714,15 @@ class GenAIClient:
         
         tech_context = ""
         if technical_analysis:
-            tech_context = f"\nTechnical Analysis Data (librosa):\n{json.dumps(technical_analysis, indent=2)}\n"
-        
-        prompt = f"""
-        Analyze the audio track in this song to create a PROFESSIONAL music video plan.
-        The total duration of the audio is {duration:.2f} seconds.
-        
-        USER REQUEST / PLOT DESCRIPTION:
-        "{user_description}"
-        (The narrative, metaphors, and events MUST follow this description if provided. If empty, invent a creative one).
-        
-        The user has requested the visual style: "{user_style}".
-
-        CHARACTER DESCRIPTION:
-        "{character_description}"
-        (If provided, this character MUST be the protagonist of the video).
-        
-        {tech_context}
-        
-        EDITING RULES (CRITICAL):
-        1. RHYTHM IS KING: Cut to the beat. Visuals must sync with the audio.
-        2. SONG STRUCTURE: You MUST identify the sections: Intro, Verse, Pre-Chorus, Chorus, Bridge, Outro.
-        3. PACING BY SECTION:
-           - Verses: Longer, cinematic shots. Focus on storytelling.
-           - Choruses: FAST cuts. Short, rhythmic clips. "Micro-series" of shots on beats. High energy.
-           - Transitions: 1-2 distinct "accent" shots with strong movement/impact.
-        4. MARKERS: Place keyframes on strong beats (kick/snare, drops).
-        
-        Please provide:
-        1. A summary of the song's energy, mood, and style.
-        2. A "global_visual_narrative": A single, cohesive visual metaphor or story concept.
-           - MUST be a concrete visual idea (e.g. "A cyberpunk detective walking through neon rain", NOT just "A journey of self-discovery").
-           - Should evolve from beginning to end.
-        3. A "visual_style_anchor": A specific, consistent visual style description BASED ON "{user_style}".
-           - Include lighting, color palette, and texture (e.g. "Cinematic lighting, teal and orange palette, film grain").
-        4. A "video_plan": A structured plan containing "scenes".
-        
-        "video_plan" structure:
-        {{
-          "scenes": [
-            {{
-              "start_time": float,
-              "end_time": float,
-              "section_type": "Intro" | "Verse" | "Chorus" | "Bridge" | "Outro",
-              "description": "Visual description of the scene",
-              "energy_level": float (0.0 to 1.0),
-              "keyframes": [
-                {{
-                  "time": float,
-                  "type": "cut" | "zoom" | "shake" | "beat",
-                  "description": "Short note",
-                  "parameters": {{}}
-                }}
-              ]
-            }}
-          ]
-        }}
-        
-        Instructions for Scenes:
-        - Segments have NO GAPS and NO OVERLAPS.
-        - Cover exactly 0.0 to {duration:.2f}.
-        - The pacing MUST follow the structure (Verse=Slow, Chorus=Fast).
-        - Use the technical analysis (Drops, Downbeats) to align scene changes and keyframes.
-        
-        Return as a JSON object with keys: "summary", "global_visual_narrative", "visual_style_anchor", "video_plan", "segments" (legacy support, map scenes to segments if needed or keep separate).
-        """
+            tech_context = f"\nTechnical Analysis Data (librosa):\n{_prompt_json(technical_analysis)}\n"
+        
+        prompt = _ANALYZE_AUDIO_TEMPLATE.substitute(
+            duration=f"{duration:.2f}",
+            user_description=user_description,
+            user_style=user_style,
+            character_description=character_description,
+            tech_context=tech_context,
+        )
         
         contents = [prompt]
         if file_ref:
@@ -419,12 +747,7 @@ class GenAIClient:
             }
 
         logger.info("Sending audio analysis request to Gemini...")
-        response = self._client.models.generate_content(
-            model=self.text_model,
-            contents=contents
-        )
-        self._log_interaction("analyze_audio", contents, response)
-        return self._extract_json(response.text)
+        return self._generate_json("analyze_audio", contents)
     
     def build_storyboard(
         self,
@@ -433,56 +756,17 @@ class GenAIClient:
         use_batch: bool = False,
     ) -> list[dict[str, Any]] | dict[str, Any]:
         """Build storyboard segments from analysis."""
-        prompt = f"""
-        Based on this analysis: {analysis}
-        
-        Create a storyboard as a JSON list of segments.
-        The total duration MUST be EXACTLY {total_duration:.2f} seconds.
-        
-        Follow the "global_visual_narrative" defined in the analysis. The video must feel like a cohesive film with a clear Narrative Arc (Beginning, Development, Climax).
-        
-        VISUAL STORYTELLING:
-        - Don't just list random images. Connect them.
-        - Use cinematographic terms (Wide Shot, Close Up, Dolly Zoom, Tracking Shot).
-        - Describe lighting and movement in EVERY segment.
-        
-        PACING & RHYTHM RULES (STRICT):
-        1. RHYTHM IS KING: Align cuts with the music's rhythm.
-        2. VERSES / INTRO = Cinematic, Longer Shots (4-8s). Focus on storytelling and establishing atmosphere.
-        3. CHORUSES / DROPS = Fast Cuts, High Energy (0.5s-2s). Flash different angles/actions on beats. "Micro-series" of shots.
-        4. TRANSITIONS = Accent shots (fast zooms/whips) on section changes.
-        5. Match the "energy_level" of the music. If the rhythm "sits", even simple pan/zoom looks professional.
-        
-        Each segment MUST have:
-        - id: a unique string like "seg_1", "seg_2", etc.
-        - start_time: "MM:SS" (or total seconds)
-        - end_time: "MM:SS" (or total seconds)
-        - lyric_text: the transcript for this segment
-        - visual_intent: a detailed description of what should be on screen, following the global narrative and current intensity.
-        - camera_angle: suggested camera shot (e.g. "Close-up", "Wide shot", "Drone shot")
-        - emotion: the detected emotion
-        - effect: "zoom_in" | "zoom_out" | "pan_left" | "pan_right" | "pan_up" | "pan_down" (Verse = smooth pans, Chorus = fast zooms)
-        - transition: "cut" | "crossfade" | "slide_left" | "slide_right" | "zoom_in" (High Energy = slide/zoom, Low Energy = crossfade)
-        
-        IMPORTANT: The segments MUST tile the entire {total_duration:.2f} seconds. 
-        The first segment must start at 00:00. 
-        The last segment must end at {total_duration:.2f}.
-        No gaps, no overlaps.
-        
-        Return ONLY the JSON list.
-        """
+        prompt = _STORYBOARD_TEMPLATE.substitute(
+            analysis=_prompt_json(analysis),
+            total_duration=f"{total_duration:.2f}",
+        )
         
         if use_batch:
             return {
                 "contents": [{"role": "user", "parts": [{"text": prompt}]}]
             }
 
-        response = self._client.models.generate_content(
-            model=self.text_model,
-            contents=[prompt]
-        )
-        self._log_interaction("build_storyboard", [prompt], response)
-        data = self._extract_json(response.text)
+        data = self._generate_json("build_storyboard", [prompt])
         
         if isinstance(data, dict) and "segments" in data:
             return data["segments"]
@@ -501,41 +785,18 @@ class GenAIClient:
         if analysis and "visual_style_anchor" in analysis:
             style_anchor = analysis["visual_style_anchor"]
         
-        prompt = f"""
-        For each of these segments, create a detailed image generation prompt.
-        
-        Global Style Anchor: "{style_anchor}" 
-        (YOU MUST APPEND THIS EXACT STYLE DESCRIPTION TO EVERY SINGLE PROMPT TO ENSURE CONSISTENCY).
-        
-        QUALITY BOOSTERS (Include these invisibly in the style):
-        "8k resolution, cinematic lighting, photorealistic, intricate detail, sharp focus, masterpiece"
-        (Unless the user style explicitly contradicts this, e.g. "pixel art").
-
-        CHARACTER CONSISTENCY:
-        Character Description: "{analysis.get('character_description', '')}"
-        (If the character appears, they MUST match this description. If the scene allows, feature this character).
-        
-        Segments: {segments}
-        
-        Return a JSON object where keys are the segment IDs ("seg_1", etc.) and values are objects containing:
-        - image_prompt: the detailed prompt for the AI image generator. MUST include the Style Anchor and Visual Intent.
-        - negative_prompt: "blurry, low quality, distorted, bad anatomy, text, watermark, signature, ugly"
-        - style_hints: keywords about the style (optional)
-        
-        Return ONLY the JSON object.
-        """
+        prompt = _IMAGE_PROMPTS_TEMPLATE.substitute(
+            style_anchor=style_anchor,
+            character_description=analysis.get("character_description", ""),
+            segments=_prompt_json(segments),
+        )
         
         if use_batch:
             return {
                 "contents": [{"role": "user", "parts": [{"text": prompt}]}]
             }
 
-        response = self._client.models.generate_content(
-            model=self.text_model,
-            contents=[prompt]
-        )
-        self._log_interaction("build_prompts", [prompt], response)
-        data = self._extract_json(response.text)
+        data = self._generate_json("build_prompts", [prompt])
         
         if isinstance(data, dict):
             if "prompts" in data and isinstance(data["prompts"], dict):
@@ -573,7 +834,7 @@ class GenAIClient:
                 response_modalities=["IMAGE"],
             )
             
-            total_bytes = b""
+            buf = bytearray()
             for chunk in self._client.models.generate_content_stream(
                 model=self.image_model,
                 contents=contents,
@@ -590,13 +851,10 @@ class GenAIClient:
                 
                 part = chunk.candidates[0].content.parts[0]
                 if part.inline_data and part.inline_data.data:
-                    total_bytes += part.inline_data.data
+                    buf.extend(part.inline_data.data)
             
-            self._log_interaction("generate_image (Multimodal Stream)", prompt, f"<Generated {len(total_bytes)} bytes>")
-            return total_bytes
-            
-            self._log_interaction("generate_image (Multimodal Stream)", prompt, f"<Generated {len(total_bytes)} bytes>")
-            return total_bytes
+            self._log_interaction("generate_image (Multimodal Stream)", prompt, f"<Generated {len(buf)} bytes>")
+            return bytes(buf)
             
         except Exception as e:
             logger.error(f"Image generation failed: {e}")
@@ -638,9 +896,7 @@ class GenAIClient:
             logger.info(f"Uploaded batch file: {file_ref.name}")
             
             # Wait for file to be processed (ACTIVE state)
-            while file_ref.state.name == "PROCESSING":
-                time.sleep(1)
-                file_ref = self._client.files.get(name=file_ref.name)
+            file_ref = self._wait_for_file(file_ref)
 
             if file_ref.state.name == "FAILED":
                 raise RuntimeError(f"Batch file processing failed: {file_ref.error.message if hasattr(file_ref, 'error') else 'Unknown error'}")
@@ -672,10 +928,15 @@ class GenAIClient:
             logger.error(f"Failed to get batch job {job_name}: {e}")
             return None
 
+    def iter_batch_jobs(self, page_size: int = 50) -> Iterator[Any]:
+        """Yield batch jobs, fetching further pages only as they are reached."""
+        yield from self._client.batches.list(config={"page_size": min(page_size, 100)})
+
     def list_batch_jobs(self, limit: int = 50) -> list[Any]:
         """List recent batch jobs."""
         try:
-            return list(self._client.batches.list(page_size=limit))
+            # Stop once `limit` jobs are in hand instead of walking every page
+            return list(islice(self.iter_batch_jobs(page_size=limit), limit))
         except Exception as e:
             logger.error(f"Failed to list batch jobs: {e}")
             return []
@@ -0,0 +1,41 @@
+"""Redis client initialization for response caching."""
+from __future__ import annotations
+
+from redis.asyncio import Redis
+
+from ..core.config import settings
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Global Redis client (shared connection pool)
+_redis_client: Redis | None = None
+
+
+def get_redis() -> Redis | None:
+    """Get or create Redis client instance."""
+    global _redis_client
+    
+    if not settings.redis_configured:
+        return None
+    
+    if _redis_client is None:
+        try:
+            _redis_client = Redis.from_url(
+                settings.redis_url,  # type: ignore
+                decode_responses=True,
+                # Cache lookups must never stall a request for long
+                socket_connect_timeout=0.5,
+                socket_timeout=0.5,
+            )
+            logger.info("Redis client initialized successfully")
+        except Exception as e:
+            logger.error("Failed to initialize Redis client: %s", e)
+            return None
+    
+    return _redis_client
+
+
+def is_redis_configured() -> bool:
+    """Check if Redis is properly configured."""
+    return settings.redis_configured
@@ -1,7 +1,8 @@
 """Supabase client initialization for backend operations."""
 from __future__ import annotations
 
-from typing import Optional
+import asyncio
+from typing import Any, Optional
 from supabase import create_client, Client
 
 from ..core.config import settings
@@ -28,7 +29,7 @@ def get_supabase() -> Client | None:
             )
             logger.info("Supabase client initialized successfully")
         except Exception as e:
-            logger.error(f"Failed to initialize Supabase client: {e}")
+            logger.error("Failed to initialize Supabase client: %s", e)
             return None
     
     return _supabase_client
@@ -37,3 +38,12 @@ def get_supabase() -> Client | None:
 def is_supabase_configured() -> bool:
     """Check if Supabase is properly configured."""
     return settings.supabase_configured
+
+
+async def execute_query(query: Any) -> Any:
+    """
+    Execute a supabase-py query builder without blocking the event loop.
+    The client is synchronous, so the HTTP call runs in a worker thread
+    while still sharing the client's pooled connection.
+    """
+    return await asyncio.to_thread(query.execute)
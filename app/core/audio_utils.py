@@ -1,8 +1,12 @@
 """Audio utilities: validation, duration, time parsing."""
 from __future__ import annotations
 
+import re
+import subprocess
+import wave
+from functools import lru_cache
 from pathlib import Path
-from typing import Union
+from typing import Any, BinaryIO, Union
 
 from .logging import get_logger
 
@@ -74,11 +78,107 @@ def validate_audio_format(content_type: str | None, filename: str | None) -> boo
     )
 
 
+def _wav_header_duration(audio_path: Path) -> float | None:
+    """Read a PCM WAV's duration from its header, or None if it can't be trusted."""
+    try:
+        with wave.open(str(audio_path), "rb") as wav:
+            rate = wav.getframerate()
+            data_size = wav.getnframes() * wav.getsampwidth() * wav.getnchannels()
+            if not rate or data_size > audio_path.stat().st_size:
+                # Streamed WAVs may carry a placeholder data size
+                return None
+            return wav.getnframes() / rate
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+def _ffprobe_duration(audio_path: Path) -> float:
+    """Read the container duration with a single ffprobe call."""
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=nw=1:nk=1",
+            str(audio_path),
+        ],
+        capture_output=True,
+        text=True,
+        timeout=10,
+        check=True,
+    )
+    return float(result.stdout.strip())
+
+
+def _import_soundfile() -> Any | None:
+    """Import soundfile lazily; None if it (or libsndfile) is unavailable."""
+    try:
+        import soundfile
+    except (ImportError, OSError) as e:
+        # OSError: the wheel is present but libsndfile itself can't be loaded
+        logger.debug("soundfile unavailable, falling back to ffprobe: %s", e)
+        return None
+    return soundfile
+
+
+def _soundfile_duration(audio_path: Path) -> float | None:
+    """Read the duration with libsndfile (WAV, FLAC, OGG, MP3); None if unsupported."""
+    soundfile = _import_soundfile()
+    if soundfile is None:
+        return None
+    
+    try:
+        return soundfile.info(str(audio_path)).duration
+    except RuntimeError:
+        # LibsndfileError: a container libsndfile can't open (e.g. M4A/AAC)
+        return None
+
+
+def probe_audio_stream(file: BinaryIO, size: int | None = None) -> float | None:
+    """
+    Read an upload's duration from its header before it is written to disk.
+    
+    Tries the WAV header, then libsndfile. Returns None if neither can read
+    the stream (e.g. M4A). The stream is rewound either way.
+    
+    Args:
+        file: Seekable file object positioned anywhere
+        size: Total size in bytes, if known
+        
+    Returns:
+        Duration in seconds, or None
+    """
+    try:
+        file.seek(0)
+        try:
+            with wave.open(file, "rb") as wav:
+                rate = wav.getframerate()
+                frames = wav.getnframes()
+                data_size = frames * wav.getsampwidth() * wav.getnchannels()
+                # Streamed WAVs may carry a placeholder data size
+                if rate and (size is None or data_size <= size):
+                    return frames / rate
+        except (wave.Error, EOFError):
+            pass
+        
+        soundfile = _import_soundfile()
+        if soundfile is None:
+            return None
+        
+        file.seek(0)
+        try:
+            return soundfile.info(file).duration
+        except RuntimeError:
+            return None
+    finally:
+        file.seek(0)
+
+
 def get_audio_duration(audio_path: Path) -> float:
     """
     Get audio file duration in seconds.
     
-    Uses moviepy for reliable duration detection across formats.
+    PCM WAV durations come straight from the header; formats libsndfile can
+    open are read with it, and anything else is probed with ffprobe.
     
     Args:
         audio_path: Path to audio file
@@ -89,19 +189,55 @@ def get_audio_duration(audio_path: Path) -> float:
     Raises:
         AudioLoadError: If file cannot be loaded
     """
+    if audio_path.suffix.lower() == ".wav":
+        duration = _wav_header_duration(audio_path)
+        if duration is not None:
+            return duration
+    
     try:
-        import moviepy.editor as mp
-        
-        clip = mp.AudioFileClip(str(audio_path))
-        duration = clip.duration
-        clip.close()
-        return duration
-        
+        duration = _soundfile_duration(audio_path)
+        if duration is not None:
+            return duration
+        return _ffprobe_duration(audio_path)
     except Exception as e:
-        logger.error(f"Failed to get audio duration for {audio_path}: {e}")
+        logger.error("Failed to get audio duration for %s: %s", audio_path, e)
         raise AudioLoadError(f"Cannot read audio file: {e}")
 
 
+# "SS", "MM:SS" or "HH:MM:SS", each with optional fractional seconds
+_TIME_RE = re.compile(r"^(?:(\d+):)?(?:(\d+):)?(\d+(?:\.\d+)?)$")
+
+
+@lru_cache(maxsize=4096)
+def parse_time_str(value: str) -> float | None:
+    """Parse a time string to seconds, or None if it isn't a recognised format."""
+    t_str = value.replace(",", ".").strip()
+    if not t_str:
+        return 0.0
+    
+    match = _TIME_RE.match(t_str)
+    if match:
+        first, second, seconds = match.groups()
+        if second is not None:
+            return float(first) * 3600 + float(second) * 60 + float(seconds)
+        if first is not None:
+            return float(first) * 60 + float(seconds)
+        return float(seconds)
+    
+    # Anything float() accepts but the pattern doesn't (signs, exponents, ".5")
+    parts = t_str.split(":")
+    try:
+        if len(parts) == 1:
+            return float(parts[0])
+        if len(parts) == 2:
+            return float(parts[0]) * 60 + float(parts[1])
+        if len(parts) == 3:
+            return float(parts[0]) * 3600 + float(parts[1]) * 60 + float(parts[2])
+    except ValueError:
+        pass
+    return None
+
+
 def parse_time(value: Union[str, int, float, None]) -> float:
     """
     Parse time value to seconds.
@@ -124,34 +260,11 @@ def parse_time(value: Union[str, int, float, None]) -> float:
     if isinstance(value, (int, float)):
         return float(value)
     
-    try:
-        # Normalize string
-        t_str = str(value).replace(",", ".").strip()
-        
-        # Handle empty string
-        if not t_str:
-            return 0.0
-        
-        parts = t_str.split(":")
-        
-        if len(parts) == 1:
-            # Just seconds
-            return float(parts[0])
-        elif len(parts) == 2:
-            # MM:SS
-            minutes, seconds = parts
-            return float(minutes) * 60 + float(seconds)
-        elif len(parts) == 3:
-            # HH:MM:SS
-            hours, minutes, seconds = parts
-            return float(hours) * 3600 + float(minutes) * 60 + float(seconds)
-        else:
-            logger.warning(f"Unexpected time format: {value}")
-            return 0.0
-            
-    except (ValueError, TypeError) as e:
-        logger.warning(f"Failed to parse time value '{value}': {e}")
+    seconds = parse_time_str(str(value))
+    if seconds is None:
+        logger.warning("Failed to parse time value %r", value)
         return 0.0
+    return seconds
 
 
 def format_time(seconds: float, include_ms: bool = False) -> str:
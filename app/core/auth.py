@@ -3,11 +3,13 @@ from __future__ import annotations
 
 from typing import Optional, Any
 from dataclasses import dataclass
+from functools import cached_property
 
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from ..core.cache import credits_cache_key, subscription_cache_key
 from ..core.config import settings
 from ..core.logging import get_logger
 from ..clients.supabase_client import get_supabase, is_supabase_configured
@@ -29,6 +31,14 @@ class AuthenticatedUser:
     def __post_init__(self):
         if self.metadata is None:
             self.metadata = {}
+    
+    @cached_property
+    def cache_keys(self) -> dict[str, str]:
+        """Cache keys for this user's data, formatted once per request."""
+        return {
+            "credits": credits_cache_key(self.id),
+            "sub": subscription_cache_key(self.id),
+        }
 
 
 def verify_jwt(token: str) -> Optional[dict]:
@@ -74,8 +74,7 @@ async def get_billing_context(
     
     # Get billing status from service
     try:
-        subscription_status = await billing_service.get_subscription_status(user.id)
-        credits = await billing_service.get_credit_balance(user.id)
+        subscription_status, credits = await billing_service.get_billing_snapshot(user.id)
         
         return BillingContext(
             user=user,
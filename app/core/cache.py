@@ -0,0 +1,87 @@
+"""Short-lived response cache: an in-process L1 in front of Redis.
+
+All helpers are best-effort: when Redis is not configured or a call fails,
+reads miss and writes are dropped so callers fall back to the origin.
+"""
+from __future__ import annotations
+
+from cachetools import TTLCache
+
+from ..clients.redis_client import get_redis
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Dashboard data is polled every few seconds; keep entries just long enough
+# to absorb the polling without noticeably delaying balance updates.
+CABINET_CACHE_TTL_SECONDS = 10
+
+# Process-local L1. Invalidation only reaches this process, so the TTL is
+# kept to about one polling interval to bound staleness on other workers.
+LOCAL_CACHE_TTL_SECONDS = 2
+_local_cache: TTLCache = TTLCache(maxsize=50_000, ttl=LOCAL_CACHE_TTL_SECONDS)
+
+
+def credits_cache_key(user_id: str) -> str:
+    """Cache key for a user's credit balance."""
+    return f"cab:credits:{user_id}"
+
+
+def subscription_cache_key(user_id: str) -> str:
+    """Cache key for a user's subscription status."""
+    return f"cab:sub:{user_id}"
+
+
+async def cache_get(key: str) -> str | None:
+    """Get a cached value, or None on miss or error."""
+    value = _local_cache.get(key)
+    if value is not None:
+        return value
+    
+    redis = get_redis()
+    if not redis:
+        return None
+    
+    try:
+        value = await redis.get(key)
+    except Exception as e:
+        logger.warning("Cache read failed for %s: %s", key, e)
+        return None
+    
+    if value is not None:
+        _local_cache[key] = value
+    return value
+
+
+async def cache_set(key: str, value: str, ttl_seconds: int = CABINET_CACHE_TTL_SECONDS) -> None:
+    """Store a value with an expiry."""
+    _local_cache[key] = value
+    
+    redis = get_redis()
+    if not redis:
+        return
+    
+    try:
+        await redis.setex(key, ttl_seconds, value)
+    except Exception as e:
+        logger.warning("Cache write failed for %s: %s", key, e)
+
+
+async def cache_delete(*keys: str) -> None:
+    """Remove cached values."""
+    for key in keys:
+        _local_cache.pop(key, None)
+    
+    redis = get_redis()
+    if not redis or not keys:
+        return
+    
+    try:
+        await redis.delete(*keys)
+    except Exception as e:
+        logger.warning("Cache invalidation failed for %s: %s", keys, e)
+
+
+async def invalidate_billing_cache(user_id: str) -> None:
+    """Drop cached billing data after a balance or subscription change."""
+    await cache_delete(credits_cache_key(user_id), subscription_cache_key(user_id))
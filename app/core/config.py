@@ -22,16 +22,30 @@ class Settings:
     genai_subtitle_model: str = "gemini-2.5-flash"
     genai_text_mode: str = "standard"
     genai_image_mode: str = "standard"
+    # Interactive Gemini requests in flight at once per pipeline
+    genai_max_concurrency: int = 5
+    # Characters of each Gemini request/response kept in the interaction log
+    log_body_max: int = 2000
+    # Seconds to replay identical text prompts from disk (0 = off). Meant for
+    # prompt tuning: while on, regenerating an unchanged prompt returns the
+    # same answer.
+    genai_response_cache_ttl: int = 0
     
     # Validation
     max_audio_duration_minutes: int = 10
     
+    # Generation / render jobs allowed to run at once per process
+    max_concurrent_generations: int = 4
+    
     # Supabase
     supabase_url: str | None = None
     supabase_key: str | None = None  # Service role key for backend
     supabase_jwt_secret: str | None = None
     supabase_jwt_public_key: str | None = None
     
+    # Redis (optional response cache)
+    redis_url: str | None = None
+    
     # Paths
     base_dir: Path = Path(__file__).resolve().parent.parent.parent
     data_dir: Path = base_dir / "data" / "projects"
@@ -48,10 +62,15 @@ class Settings:
             genai_subtitle_model=os.getenv("GENAI_SUBTITLE_MODEL", "gemini-2.5-flash"),
             genai_text_mode=os.getenv("GENAI_TEXT_MODE", "standard"),
             genai_image_mode=os.getenv("GENAI_IMAGE_MODE", "standard"),
+            genai_max_concurrency=int(os.getenv("GENAI_MAX_CONCURRENCY", "5")),
+            log_body_max=int(os.getenv("LOG_BODY_MAX", "2000")),
+            genai_response_cache_ttl=int(os.getenv("GENAI_RESPONSE_CACHE_TTL", "0")),
             supabase_url=os.getenv("SUPABASE_URL"),
             supabase_key=os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY"),
             supabase_jwt_secret=(os.getenv("SUPABASE_JWT_SECRET") or "").strip().strip('"').strip("'"),
             supabase_jwt_public_key=(os.getenv("SUPABASE_JWT_PUBLIC_KEY") or "").replace("\\n", "\n").strip().strip('"').strip("'"),
+            max_concurrent_generations=int(os.getenv("MAX_CONCURRENT_GENERATIONS", "4")),
+            redis_url=os.getenv("REDIS_URL"),
             base_dir=base_dir,
             data_dir=Path(os.getenv("PROJECTS_DATA_DIR")) if os.getenv("PROJECTS_DATA_DIR") else base_dir / "data" / "projects",
             frontend_dir=base_dir / "frontend-react" / "dist",
@@ -61,6 +80,11 @@ class Settings:
     def supabase_configured(self) -> bool:
         """Check if Supabase is properly configured."""
         return bool(self.supabase_url and self.supabase_key)
+    
+    @property
+    def redis_configured(self) -> bool:
+        """Check if Redis is configured."""
+        return bool(self.redis_url)
 
 
 # Global settings instance
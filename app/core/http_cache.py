@@ -0,0 +1,85 @@
+"""HTTP conditional request helpers (ETag / If-None-Match)."""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+# Dashboard reads: let the browser reuse a response briefly, then revalidate
+POLLING_CACHE_CONTROL = "private, max-age=5, stale-while-revalidate=30"
+# Data that changes with every generation: always revalidate
+REVALIDATE_CACHE_CONTROL = "private, max-age=0, must-revalidate"
+
+
+def etag_for_bytes(payload: bytes) -> str:
+    """Compute a strong ETag for an already-serialized body."""
+    return f'"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+
+
+def compute_etag(data: Any) -> str:
+    """Compute a strong ETag for a response payload."""
+    if isinstance(data, BaseModel):
+        payload = data.model_dump_json().encode("utf-8")
+    else:
+        payload = json.dumps(
+            jsonable_encoder(data), sort_keys=True, separators=(",", ":")
+        ).encode("utf-8")
+    return etag_for_bytes(payload)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match header covers the given ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        # Weak comparison is sufficient for GET revalidation
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    data: Any,
+    cache_control: str = POLLING_CACHE_CONTROL,
+) -> Any:
+    """
+    Return 304 Not Modified if the client already has this payload,
+    otherwise attach the ETag and return the data unchanged.
+    """
+    etag = compute_etag(data)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return data
+
+
+def conditional_json_response(
+    request: Request,
+    body: bytes,
+    cache_control: str = POLLING_CACHE_CONTROL,
+) -> Response:
+    """
+    Build a JSON response from a pre-serialized body, or 304 Not Modified
+    if the client already has it. The ETag is taken over the same bytes.
+    """
+    etag = etag_for_bytes(body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
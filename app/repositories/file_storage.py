@@ -1,12 +1,53 @@
 """File storage for binary assets (images, audio, video)."""
 from __future__ import annotations
 
+import os
+import re
 import shutil
+import threading
+import time
 from pathlib import Path
 from typing import BinaryIO
 
+import anyio
+import orjson
+from fastapi import UploadFile
+
 from ..core.config import settings
 
+# Copy buffer for uploads; large buffers keep syscall counts low for big videos
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# renders dir -> (dir mtime_ns, latest render). Adding or removing a render
+# changes the directory mtime, which invalidates the entry.
+_latest_render_cache: dict[str, tuple[int, Path | None]] = {}
+_RACY_WINDOW_NS = 1_000_000_000
+
+# Matches generated image names: "{seg_id}_v{version}.png"
+_VERSION_RE = re.compile(r"(.+)_v(\d+)\.png$")
+
+
+def _copy_to_disk(src: BinaryIO, target: Path, size: int | None = None) -> Path:
+    """Copy a file object to disk in large chunks, preallocating when the size is known."""
+    with target.open("wb") as dst:
+        if size and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(dst.fileno(), 0, size)
+            except OSError:
+                pass
+        shutil.copyfileobj(src, dst, UPLOAD_CHUNK_SIZE)
+        # Drop any preallocated tail if the source was shorter than announced
+        dst.truncate()
+    return target
+
+
+def _stat_path(path: Path) -> tuple[Path, os.stat_result] | None:
+    """Stat a file, returning None if it doesn't exist."""
+    try:
+        return path, path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
 
 class FileStorage:
     """Storage for binary files."""
@@ -18,18 +59,27 @@ class FileStorage:
         """Get the base path for a project."""
         return self.data_dir / project_id
     
-    def save_audio(self, project_id: str, file: BinaryIO, filename: str) -> Path:
-        """Save an uploaded audio file."""
+    def _source_target(self, project_id: str, stem: str, filename: str, default_ext: str) -> Path:
+        """Build the source file path for an upload, creating the directory."""
         source_dir = self._project_path(project_id) / "source"
         source_dir.mkdir(parents=True, exist_ok=True)
-        
-        extension = Path(filename).suffix or ".wav"
-        target = source_dir / f"track{extension}"
-        
-        with target.open("wb") as buffer:
-            shutil.copyfileobj(file, buffer)
-        
-        return target
+        extension = Path(filename).suffix or default_ext
+        return source_dir / f"{stem}{extension}"
+    
+    @staticmethod
+    async def _write_upload(upload: UploadFile, target: Path) -> Path:
+        """Copy an upload to disk in one worker-thread hop, off the event loop."""
+        return await anyio.to_thread.run_sync(_copy_to_disk, upload.file, target, upload.size)
+    
+    def save_audio(self, project_id: str, file: BinaryIO, filename: str) -> Path:
+        """Save an uploaded audio file."""
+        target = self._source_target(project_id, "track", filename, ".wav")
+        return _copy_to_disk(file, target)
+    
+    async def save_audio_stream(self, project_id: str, upload: UploadFile, filename: str) -> Path:
+        """Save an uploaded audio file without blocking the event loop."""
+        target = self._source_target(project_id, "track", filename, ".wav")
+        return await self._write_upload(upload, target)
     
     def get_audio_path(self, project_id: str) -> Path | None:
         """Get the audio file path for a project."""
@@ -55,24 +105,45 @@ class FileStorage:
         path = self._project_path(project_id) / "images" / image_name
         return path if path.exists() else None
     
+    def stat_image(self, project_id: str, image_name: str) -> tuple[Path, os.stat_result] | None:
+        """Get an image's path and stat result with a single stat call."""
+        return _stat_path(self._project_path(project_id) / "images" / image_name)
+    
     def get_latest_render(self, project_id: str) -> Path | None:
-        """Get the latest rendered video."""
+        """Get the latest rendered video, rescanning only when the renders dir changes."""
         renders_dir = self._project_path(project_id) / "renders"
-        if not renders_dir.exists():
+        try:
+            dir_mtime = renders_dir.stat().st_mtime_ns
+        except FileNotFoundError:
             return None
         
+        key = str(renders_dir)
+        cached = _latest_render_cache.get(key)
+        if cached and cached[0] == dir_mtime:
+            return cached[1]
+        
         mp4_files = sorted(
             renders_dir.glob("*.mp4"),
             key=lambda f: f.stat().st_mtime,
             reverse=True
         )
-        return mp4_files[0] if mp4_files else None
+        latest = mp4_files[0] if mp4_files else None
+        
+        # A stamp from the current timestamp tick may not reflect a file
+        # created later in that same tick; only cache settled directories.
+        if time.time_ns() - dir_mtime > _RACY_WINDOW_NS:
+            _latest_render_cache[key] = (dir_mtime, latest)
+        return latest
     
     def get_render_path(self, project_id: str, render_name: str) -> Path | None:
         """Get a specific render file path."""
         path = self._project_path(project_id) / "renders" / render_name
         return path if path.exists() else None
     
+    def stat_render(self, project_id: str, render_name: str) -> tuple[Path, os.stat_result] | None:
+        """Get a render's path and stat result with a single stat call."""
+        return _stat_path(self._project_path(project_id) / "renders" / render_name)
+    
     def get_next_render_path(self, project_id: str) -> Path:
         """Get the path for the next render version."""
         renders_dir = self._project_path(project_id) / "renders"
@@ -111,6 +182,27 @@ class FileStorage:
                 
         return max_v
 
+    def get_all_max_versions(self, project_id: str) -> dict[str, int]:
+        """Get the highest image version for every segment in one directory scan."""
+        images_dir = self._project_path(project_id) / "images"
+        versions: dict[str, int] = {}
+        
+        try:
+            entries = os.scandir(images_dir)
+        except FileNotFoundError:
+            return versions
+        
+        with entries:
+            for entry in entries:
+                match = _VERSION_RE.match(entry.name)
+                if not match:
+                    continue
+                seg_id, v = match.group(1), int(match.group(2))
+                if v > versions.get(seg_id, 0):
+                    versions[seg_id] = v
+        
+        return versions
+
     # ==================== Subtitle Storage Methods ====================
     
     def save_subtitles(self, project_id: str, content: str) -> Path:
@@ -128,20 +220,23 @@ class FileStorage:
     
     def save_subtitle_styling(self, project_id: str, styling: dict) -> Path:
         """Save subtitle styling config as JSON."""
-        import json
         subs_dir = self._project_path(project_id) / "subtitles"
         subs_dir.mkdir(parents=True, exist_ok=True)
         path = subs_dir / "styling.json"
-        path.write_text(json.dumps(styling, indent=2), encoding="utf-8")
+        # Replace atomically: styling may be read while it is being saved. The
+        # temp name is unique per writer so concurrent saves don't share it.
+        tmp_path = subs_dir / f"styling.json.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_path.write_bytes(orjson.dumps(styling, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_path, path)
         return path
     
     def get_subtitle_styling(self, project_id: str) -> dict | None:
         """Load subtitle styling config from JSON."""
-        import json
         path = self._project_path(project_id) / "subtitles" / "styling.json"
-        if path.exists():
-            return json.loads(path.read_text(encoding="utf-8"))
-        return None
+        try:
+            return orjson.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
     
     def delete_subtitles(self, project_id: str) -> None:
         """Delete all subtitle files for a project."""
@@ -153,16 +248,13 @@ class FileStorage:
     
     def save_video(self, project_id: str, file: BinaryIO, filename: str) -> Path:
         """Save an uploaded video file for standalone subtitle mode."""
-        source_dir = self._project_path(project_id) / "source"
-        source_dir.mkdir(parents=True, exist_ok=True)
-        
-        extension = Path(filename).suffix or ".mp4"
-        target = source_dir / f"video{extension}"
-        
-        with target.open("wb") as buffer:
-            shutil.copyfileobj(file, buffer)
-        
-        return target
+        target = self._source_target(project_id, "video", filename, ".mp4")
+        return _copy_to_disk(file, target)
+    
+    async def save_video_stream(self, project_id: str, upload: UploadFile, filename: str) -> Path:
+        """Save an uploaded video file without blocking the event loop."""
+        target = self._source_target(project_id, "video", filename, ".mp4")
+        return await self._write_upload(upload, target)
     
     def get_video_path(self, project_id: str) -> Path | None:
         """Get the uploaded video file path for a project."""
@@ -2,13 +2,28 @@
 from __future__ import annotations
 
 import json
+import os
 import threading
 from pathlib import Path
 from typing import Any, TypeVar, Generic
 from contextlib import contextmanager
 
+import orjson
+
 T = TypeVar("T")
 
+# Same layout as json.dumps(indent=2, ensure_ascii=False). numpy scalars from
+# the audio analysis were accepted by json, so orjson must accept them too.
+_DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _loads(raw: bytes) -> Any:
+    """Parse JSON with orjson, falling back to stdlib for NaN/Infinity literals."""
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return json.loads(raw)
+
 
 class FileLock:
     """Simple file-based locking mechanism using threading locks."""
@@ -38,14 +53,27 @@ class JsonRepository:
         with lock:
             yield path
     
+    @contextmanager
+    def locked(self, relative_path: str):
+        """Hold a file's lock across a load/modify/save sequence."""
+        with self._locked_file(self.base_path / relative_path):
+            yield
+    
+    @staticmethod
+    def _write(path: Path, data: Any) -> None:
+        """Write JSON via a temp file and os.replace so readers never see a partial file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_bytes(orjson.dumps(data, option=_DUMP_OPTIONS))
+        os.replace(tmp_path, path)
+    
     def load(self, relative_path: str, default: Any = None) -> Any:
         """Load JSON from a file, returning default if not found."""
         path = self.base_path / relative_path
         with self._locked_file(path):
-            if not path.exists():
-                return default
+            # Missing files surface as FileNotFoundError (an OSError): no separate stat
             try:
-                return json.loads(path.read_text(encoding="utf-8"))
+                return _loads(path.read_bytes())
             except (json.JSONDecodeError, OSError):
                 return default
     
@@ -53,33 +81,23 @@ class JsonRepository:
         """Save data to a JSON file."""
         path = self.base_path / relative_path
         with self._locked_file(path):
-            path.parent.mkdir(parents=True, exist_ok=True)
-            path.write_text(
-                json.dumps(data, ensure_ascii=False, indent=2),
-                encoding="utf-8"
-            )
+            self._write(path, data)
     
     def update(self, relative_path: str, updates: dict[str, Any]) -> dict[str, Any]:
         """Atomically update a JSON file with new values."""
         path = self.base_path / relative_path
         with self._locked_file(path):
-            data = {}
-            if path.exists():
-                try:
-                    data = json.loads(path.read_text(encoding="utf-8"))
-                except (json.JSONDecodeError, OSError):
-                    data = {}
+            try:
+                data = _loads(path.read_bytes())
+            except (json.JSONDecodeError, OSError):
+                data = {}
             
             if isinstance(data, dict):
                 data.update(updates)
             else:
                 data = updates
             
-            path.parent.mkdir(parents=True, exist_ok=True)
-            path.write_text(
-                json.dumps(data, ensure_ascii=False, indent=2),
-                encoding="utf-8"
-            )
+            self._write(path, data)
             return data
     
     def exists(self, relative_path: str) -> bool:
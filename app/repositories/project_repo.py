@@ -1,14 +1,61 @@
 """Project repository for managing project data."""
 from __future__ import annotations
 
+import os
+import threading
+import time
 import uuid
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from cachetools import LRUCache, TTLCache
+
 from .json_repo import JsonRepository
 from ..core.config import settings
 
+# Project metadata is polled by the UI but changes rarely. Entries are shared
+# by every ProjectRepository instance in the process (keyed by data_dir) so
+# writes from the pipeline invalidate what the API serves. Invalidation only
+# reaches this process: with several workers, a write made by another one
+# shows up here once the entry expires, up to PROJECT_CACHE_TTL_SECONDS later.
+PROJECT_CACHE_TTL_SECONDS = 10
+_project_cache: TTLCache = TTLCache(maxsize=4096, ttl=PROJECT_CACHE_TTL_SECONDS)
+_list_cache: TTLCache = TTLCache(maxsize=256, ttl=PROJECT_CACHE_TTL_SECONDS)
+_cache_lock = threading.Lock()
+# Bumped by every invalidation. Reads run outside the lock, so a result is
+# only cached if no write was invalidated between starting the read and
+# storing it; otherwise a reader could put back data that a write replaced.
+_project_generation: dict[tuple[str, str], int] = {}
+_list_generation: dict[str, int] = {}
+
+# Parsed project documents keyed by (data_dir, project_id) and stamped with
+# the project and jobs directory mtimes. JsonRepository writes replace files
+# atomically, which bumps the containing directory's mtime on every save.
+_bundle_cache: LRUCache = LRUCache(maxsize=256)
+# Directory mtimes have coarse (tick-level) granularity, so a stamp this
+# recent may not yet reflect a write landing in the same tick; don't trust it.
+_BUNDLE_RACY_WINDOW_NS = 1_000_000_000
+
+
+@dataclass
+class ProjectBundle:
+    """Read-only snapshot of a project's JSON documents. Do not mutate."""
+    project: dict[str, Any] | None = None
+    analysis: dict[str, Any] | None = None
+    segments: list[dict[str, Any]] = field(default_factory=list)
+    prompts: dict[str, Any] = field(default_factory=dict)
+    jobs: dict[str, Any] = field(default_factory=dict)
+
+
+def _mtime_ns(path: Path) -> int:
+    """Directory mtime in ns, or 0 if it doesn't exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
 
 def _utc_now() -> str:
     """Get current UTC time as ISO string."""
@@ -26,6 +73,17 @@ class ProjectRepository:
         """Get a JsonRepository for a specific project."""
         return JsonRepository(self.data_dir / project_id)
     
+    def _invalidate(self, project_id: str) -> None:
+        """Drop cached metadata for a project and every cached listing."""
+        base = str(self.data_dir)
+        key = (base, project_id)
+        with _cache_lock:
+            _project_generation[key] = _project_generation.get(key, 0) + 1
+            _list_generation[base] = _list_generation.get(base, 0) + 1
+            _project_cache.pop(key, None)
+            for list_key in [k for k in _list_cache if k[0] == base]:
+                _list_cache.pop(list_key, None)
+    
     def ensure_dirs(self, project_id: str) -> dict[str, Path]:
         """Ensure all project directories exist."""
         project_dir = self.data_dir / project_id
@@ -60,20 +118,44 @@ class ProjectRepository:
         
         repo = self._get_repo(project_id)
         repo.save("project.json", project_data)
+        self._invalidate(project_id)
         return project_data
     
     def get(self, project_id: str) -> dict[str, Any] | None:
         """Get a project by ID."""
-        repo = self._get_repo(project_id)
-        if not repo.exists("project.json"):
-            return None
-        return repo.load("project.json", {})
+        key = (str(self.data_dir), project_id)
+        with _cache_lock:
+            cached = _project_cache.get(key)
+            generation = _project_generation.get(key, 0)
+        if cached is not None:
+            return dict(cached)
+        
+        project = self._get_repo(project_id).load("project.json", None)
+        if project:
+            with _cache_lock:
+                if _project_generation.get(key, 0) == generation:
+                    _project_cache[key] = dict(project)
+        return project
+    
+    def get_format(self, project_id: str) -> str | None:
+        """Get a project's aspect-ratio format without copying the whole project."""
+        key = (str(self.data_dir), project_id)
+        with _cache_lock:
+            cached = _project_cache.get(key)
+        if cached is not None:
+            return cached.get("format")
+        
+        project = self.get(project_id)
+        return project.get("format") if project else None
     
     def update(self, project_id: str, updates: dict[str, Any]) -> dict[str, Any]:
         """Update project fields."""
         updates["updated_at"] = _utc_now()
         repo = self._get_repo(project_id)
-        return repo.update("project.json", updates)
+        try:
+            return repo.update("project.json", updates)
+        finally:
+            self._invalidate(project_id)
     
     def exists(self, project_id: str) -> bool:
         """Check if a project exists."""
@@ -81,6 +163,13 @@ class ProjectRepository:
     
     def list_all(self, search: str | None = None) -> list[dict[str, Any]]:
         """List all projects, sorted by updated_at descending, optionally filtered by search."""
+        key = (str(self.data_dir), search or "")
+        with _cache_lock:
+            cached = _list_cache.get(key)
+            generation = _list_generation.get(key[0], 0)
+        if cached is not None:
+            return [dict(project) for project in cached]
+        
         projects = []
         if not self.data_dir.exists():
             return projects
@@ -90,23 +179,53 @@ class ProjectRepository:
         for project_dir in self.data_dir.iterdir():
             if project_dir.is_dir():
                 repo = JsonRepository(project_dir)
-                if repo.exists("project.json"):
-                    project = repo.load("project.json", {})
-                    if not project:
+                project = repo.load("project.json", {})
+                if not project:
+                    continue
+                
+                # Search filtering
+                if search_lower:
+                    project_id = str(project.get("id", "")).lower()
+                    description = str(project.get("user_description", "")).lower()
+                    if search_lower not in project_id and search_lower not in description:
                         continue
-                    
-                    # Search filtering
-                    if search_lower:
-                        project_id = str(project.get("id", "")).lower()
-                        description = str(project.get("user_description", "")).lower()
-                        if search_lower not in project_id and search_lower not in description:
-                            continue
-                            
-                    projects.append(project)
+                        
+                projects.append(project)
         
         projects.sort(key=lambda x: x.get("updated_at", ""), reverse=True)
+        with _cache_lock:
+            if _list_generation.get(key[0], 0) == generation:
+                _list_cache[key] = [dict(project) for project in projects]
         return projects
     
+    def load_bundle(self, project_id: str) -> ProjectBundle:
+        """
+        Load project, analysis, segments, prompts and jobs together, reusing
+        the last parse until a write changes the project or jobs directory.
+        """
+        project_dir = self.data_dir / project_id
+        stamp = (_mtime_ns(project_dir), _mtime_ns(project_dir / "jobs"))
+        key = (str(self.data_dir), project_id)
+        
+        with _cache_lock:
+            cached = _bundle_cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
+        repo = self._get_repo(project_id)
+        bundle = ProjectBundle(
+            project=repo.load("project.json", None),
+            analysis=repo.load("analysis.json", None),
+            segments=repo.load("segments.json", []),
+            prompts=repo.load("prompts.json", {}),
+            jobs=self.get_jobs(project_id),
+        )
+        
+        if time.time_ns() - max(stamp) > _BUNDLE_RACY_WINDOW_NS:
+            with _cache_lock:
+                _bundle_cache[key] = (stamp, bundle)
+        return bundle
+    
     # Analysis
     def save_analysis(self, project_id: str, analysis: dict[str, Any]) -> None:
         """Save audio analysis results."""
@@ -114,10 +233,7 @@ class ProjectRepository:
     
     def get_analysis(self, project_id: str) -> dict[str, Any] | None:
         """Get audio analysis results."""
-        repo = self._get_repo(project_id)
-        if not repo.exists("analysis.json"):
-            return None
-        return repo.load("analysis.json", {})
+        return self._get_repo(project_id).load("analysis.json", None)
     
     # Segments
     def save_segments(self, project_id: str, segments: list[dict[str, Any]]) -> None:
@@ -129,16 +245,21 @@ class ProjectRepository:
         return self._get_repo(project_id).load("segments.json", [])
     
     def update_segment(self, project_id: str, seg_id: str, updates: dict[str, Any]) -> dict[str, Any] | None:
-        """Update a specific segment."""
+        """Update a specific segment in a single locked load/save."""
         repo = self._get_repo(project_id)
-        segments = repo.load("segments.json", [])
-        
-        for segment in segments:
-            if segment.get("id") == seg_id:
+        with repo.locked("segments.json"):
+            segments = repo.load("segments.json", [])
+            segment = next(
+                (s for s in segments if isinstance(s, dict) and s.get("id") == seg_id),
+                None,
+            )
+            if segment is None:
+                return None
+            
+            if updates:
                 segment.update(updates)
                 repo.save("segments.json", segments)
-                return segment
-        return None
+            return segment
     
     # Prompts
     def save_prompts(self, project_id: str, prompts: dict[str, Any]) -> None:
@@ -152,14 +273,15 @@ class ProjectRepository:
     def update_prompt(self, project_id: str, seg_id: str, updates: dict[str, Any]) -> dict[str, Any]:
         """Update a specific prompt."""
         repo = self._get_repo(project_id)
-        prompts = repo.load("prompts.json", {})
-        
-        if seg_id not in prompts:
-            prompts[seg_id] = {"version": 1}
-        
-        prompts[seg_id].update(updates)
-        repo.save("prompts.json", prompts)
-        return prompts[seg_id]
+        with repo.locked("prompts.json"):
+            prompts = repo.load("prompts.json", {})
+            
+            if seg_id not in prompts:
+                prompts[seg_id] = {"version": 1}
+            
+            prompts[seg_id].update(updates)
+            repo.save("prompts.json", prompts)
+            return prompts[seg_id]
     
     # Jobs
     def update_job(self, project_id: str, job_name: str, updates: dict[str, Any]) -> dict[str, Any]:
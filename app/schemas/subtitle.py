@@ -1,7 +1,9 @@
 """Subtitle-related Pydantic schemas."""
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Optional
+
 from pydantic import BaseModel, Field
 
 
@@ -130,8 +132,9 @@ class FontInfo(BaseModel):
     category: str  # sans-serif, serif, display, monospace
 
 
-def get_available_fonts() -> list[FontInfo]:
-    """Get list of available fonts with categories."""
+@lru_cache(maxsize=1)
+def get_available_fonts() -> tuple[FontInfo, ...]:
+    """Get available fonts with categories (built once, shared read-only)."""
     categories = {
         "sans-serif": [
             "Montserrat", "Inter", "Roboto", "Open Sans", "Lato", "Poppins",
@@ -159,4 +162,4 @@ def get_available_fonts() -> list[FontInfo]:
         for name in font_names:
             fonts.append(FontInfo(name=name, category=category))
     
-    return fonts
+    return tuple(fonts)
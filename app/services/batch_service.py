@@ -5,7 +5,9 @@ import json
 import time
 import uuid
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
+
+import orjson
 
 from ..clients.genai import GenAIClient
 from ..core.config import settings
@@ -13,6 +15,13 @@ from ..core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Batch polls start here and double up to the caller's poll_interval, so
+# small jobs (a single prompts request) are picked up within seconds.
+_FIRST_POLL_DELAY = 2.0
+
+# Batch input files can hold hundreds of inline requests
+_JSONL_BUFFER_SIZE = 1 << 20
+
 
 class BatchService:
     """Service to prepare, submit, and manage Gemini batch jobs."""
@@ -31,7 +40,7 @@ class BatchService:
 
     def create_jsonl_file(
         self,
-        requests: list[dict[str, Any] | str],
+        requests: Iterable[dict[str, Any] | str],
         job_id: str,
         generation_config: dict[str, Any] | None = None
     ) -> Path:
@@ -39,7 +48,7 @@ class BatchService:
         Create a JSONL file formatted for Gemini Batch API.
         
         Args:
-            requests: List of prompts (str) or formatted request objects (dict).
+            requests: Prompts (str) or formatted request objects (dict); consumed lazily.
             job_id: Unique identifier for this job.
             generation_config: Optional config common for all requests (e.g. response_modalities).
             
@@ -48,7 +57,8 @@ class BatchService:
         """
         file_path = self.batch_dir / f"{job_id}.jsonl"
         
-        with open(file_path, "w", encoding="utf-8") as f:
+        # Entries are streamed straight to a large write buffer, one line each
+        with open(file_path, "wb", buffering=_JSONL_BUFFER_SIZE) as f:
             for i, req in enumerate(requests):
                 # Default structure
                 custom_id = f"{job_id}-{i}"
@@ -97,7 +107,7 @@ class BatchService:
                     else:
                         pass
                 
-                f.write(json.dumps(entry) + "\n")
+                f.write(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE))
         
         logger.info(f"Created batch file: {file_path}")
         return file_path
@@ -230,6 +240,8 @@ class BatchService:
     async def wait_for_job_async(self, job_name: str, poll_interval: int = 10) -> str:
         """
         Wait for a batch job to complete (Async).
+        
+        Polls with exponential backoff capped at poll_interval seconds.
         """
         logger.info(f"Waiting for batch job {job_name} (async)...")
         from app.services.gemini_batch_runner import GeminiBatchRunner
@@ -237,6 +249,7 @@ class BatchService:
         
         runner = GeminiBatchRunner(api_key=self.client.api_key, model="gemini-1.5-flash")
         
+        delay = min(_FIRST_POLL_DELAY, poll_interval)
         try:
             while True:
                 # We need to run the REST call in a thread because it's synchronous requests
@@ -251,7 +264,8 @@ class BatchService:
                 elif state in ["BATCH_STATE_FAILED", "FAILED", "BATCH_STATE_CANCELLED", "CANCELLED", "BATCH_STATE_EXPIRED"]:
                     return "FAILED"
                 
-                await asyncio.sleep(poll_interval)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, poll_interval)
                 
         except Exception as e:
             logger.error(f"Error polling batch job: {e}")
@@ -260,12 +274,15 @@ class BatchService:
     def wait_for_job(self, job_name: str, poll_interval: int = 10) -> str:
         """
         Wait for a batch job to complete (Sync/Blocking).
+        
+        Polls with exponential backoff capped at poll_interval seconds.
         """
         logger.info(f"Waiting for batch job {job_name}...")
         from app.services.gemini_batch_runner import GeminiBatchRunner
         
         runner = GeminiBatchRunner(api_key=self.client.api_key, model="gemini-1.5-flash")
         
+        delay = min(_FIRST_POLL_DELAY, poll_interval)
         try:
             while True:
                 rest_job = runner._get_batch_job_rest(job_name)
@@ -278,7 +295,8 @@ class BatchService:
                 elif state in ["BATCH_STATE_FAILED", "FAILED", "BATCH_STATE_CANCELLED", "CANCELLED", "BATCH_STATE_EXPIRED"]:
                     return "FAILED"
                 
-                time.sleep(poll_interval)
+                time.sleep(delay)
+                delay = min(delay * 2, poll_interval)
                 
         except Exception as e:
             logger.error(f"Error polling batch job: {e}")
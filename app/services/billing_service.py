@@ -1,10 +1,14 @@
 """Billing service for credits and subscription management."""
 from __future__ import annotations
 
-from typing import Optional, List, Dict, Any
+import asyncio
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, List, Dict, Any
 from datetime import datetime, timezone
 
-from ..clients.supabase_client import get_supabase, is_supabase_configured
+from ..clients.supabase_client import execute_query, get_supabase, is_supabase_configured
+from ..core.cache import invalidate_billing_cache
 from ..core.logging import get_logger
 from ..schemas.cabinet import (
     CreditBalance,
@@ -53,6 +57,34 @@ SUBSCRIPTION_PLANS = {
 }
 
 
+@dataclass(frozen=True)
+class TransactionCursor:
+    """
+    Keyset position in a user's transaction history: (created_at, id).
+    
+    created_at alone is not unique (rows written in one transaction share
+    now()), so the id breaks ties and no row is skipped at a page boundary.
+    """
+    created_at: datetime
+    id: Optional[str] = None
+    
+    @classmethod
+    def parse(cls, value: str) -> "TransactionCursor":
+        """Parse "<created_at>,<id>"; a bare timestamp is accepted for older clients."""
+        created_at, _, row_id = value.strip().partition(",")
+        parsed_at = datetime.fromisoformat(created_at.strip().replace(" ", "+").replace("Z", "+00:00"))
+        # Validated as a UUID since it is spliced into a PostgREST filter
+        return cls(parsed_at, str(uuid.UUID(row_id.strip())) if row_id.strip() else None)
+    
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "TransactionCursor":
+        """Cursor pointing just past the given row."""
+        return cls.parse(f"{row['created_at']},{row.get('id') or ''}")
+    
+    def __str__(self) -> str:
+        return f"{self.created_at.isoformat()},{self.id}" if self.id else self.created_at.isoformat()
+
+
 class BillingService:
     """Service for managing user credits and subscriptions."""
     
@@ -78,17 +110,17 @@ class BillingService:
         supabase = self._ensure_supabase()
         
         try:
-            response = supabase.table("user_credits") \
+            query = supabase.table("user_credits") \
                 .select("balance") \
                 .eq("user_id", user_id) \
-                .single() \
-                .execute()
+                .single()
+            response = await execute_query(query)
             
             if response.data:
                 return response.data.get("balance", 0)
             return 0
         except Exception as e:
-            logger.error(f"Failed to get credit balance for {user_id}: {e}")
+            logger.error("Failed to get credit balance for %s: %s", user_id, e)
             return 0
     
     async def deduct_credits(
@@ -106,13 +138,13 @@ class BillingService:
         
         try:
             # Call the atomic deduct_credits function
-            response = supabase.rpc("deduct_credits", {
+            response = await execute_query(supabase.rpc("deduct_credits", {
                 "p_user_id": user_id,
                 "p_amount": amount,
                 "p_description": description,
                 "p_transaction_type": "generation_deduct",
                 "p_reference_id": reference_id
-            }).execute()
+            }))
             
             result = response.data
             
@@ -123,6 +155,7 @@ class BillingService:
                 )
             
             if result.get("success"):
+                await invalidate_billing_cache(user_id)
                 return CreditDeductResponse(
                     success=True,
                     transaction_id=result.get("transaction_id"),
@@ -136,7 +169,7 @@ class BillingService:
                 )
                 
         except Exception as e:
-            logger.error(f"Credit deduction failed for {user_id}: {e}")
+            logger.error("Credit deduction failed for %s: %s", user_id, e)
             return CreditDeductResponse(
                 success=False,
                 error=str(e)
@@ -156,17 +189,18 @@ class BillingService:
         supabase = self._ensure_supabase()
         
         try:
-            response = supabase.rpc("add_credits", {
+            response = await execute_query(supabase.rpc("add_credits", {
                 "p_user_id": user_id,
                 "p_amount": amount,
                 "p_description": description,
                 "p_transaction_type": transaction_type,
                 "p_reference_id": reference_id
-            }).execute()
+            }))
             
             result = response.data
             
             if result and result.get("success"):
+                await invalidate_billing_cache(user_id)
                 return CreditDeductResponse(
                     success=True,
                     transaction_id=result.get("transaction_id"),
@@ -180,7 +214,7 @@ class BillingService:
                 )
                 
         except Exception as e:
-            logger.error(f"Credit addition failed for {user_id}: {e}")
+            logger.error("Credit addition failed for %s: %s", user_id, e)
             return CreditDeductResponse(
                 success=False,
                 error=str(e)
@@ -206,27 +240,74 @@ class BillingService:
         self,
         user_id: str,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[TransactionCursor] = None
     ) -> List[Dict[str, Any]]:
-        """Get user's transaction history."""
+        """
+        Get user's transaction history, newest first.
+        With a cursor (position of the last row already seen), pages by
+        keyset instead of offset so deep pages cost the same as the first.
+        """
         if not self.is_configured:
             return []
             
         supabase = self._ensure_supabase()
         
         try:
-            response = supabase.table("credit_transactions") \
+            query = supabase.table("credit_transactions") \
                 .select("*") \
                 .eq("user_id", user_id) \
                 .order("created_at", desc=True) \
-                .range(offset, offset + limit - 1) \
-                .execute()
+                .order("id", desc=True)
+            
+            if cursor is not None:
+                created_at = cursor.created_at.isoformat()
+                if cursor.id:
+                    # (created_at, id) < cursor, in PostgREST filter syntax
+                    query = query.or_(
+                        f'created_at.lt."{created_at}",'
+                        f'and(created_at.eq."{created_at}",id.lt.{cursor.id})'
+                    )
+                else:
+                    query = query.lt("created_at", created_at)
+                query = query.limit(limit)
+            else:
+                query = query.range(offset, offset + limit - 1)
+            
+            response = await execute_query(query)
             
             return response.data or []
         except Exception as e:
-            logger.error(f"Failed to get transactions for {user_id}: {e}")
+            logger.error("Failed to get transactions for %s: %s", user_id, e)
             return []
             
+    async def stream_transactions(
+        self,
+        user_id: str,
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[TransactionCursor] = None,
+        page_size: int = 500
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield up to `limit` transactions, newest first, fetching them in
+        keyset-paginated pages so large histories are never held in memory.
+        """
+        remaining = limit
+        while remaining > 0:
+            page = await self.get_transaction_history(
+                user_id, min(page_size, remaining), offset, cursor=cursor
+            )
+            for row in page:
+                yield row
+            
+            if len(page) < min(page_size, remaining):
+                return
+            
+            remaining -= len(page)
+            offset = 0
+            cursor = TransactionCursor.from_row(page[-1])
+    
     async def get_user_projects(self, user_id: str) -> List[Dict[str, Any]]:
         """Get user's projects with metadata."""
         if not self.is_configured:
@@ -235,15 +316,15 @@ class BillingService:
         supabase = self._ensure_supabase()
 
         try:
-            response = supabase.table("user_projects") \
+            query = supabase.table("user_projects") \
                 .select("*, generation_history(count)") \
                 .eq("user_id", user_id) \
-                .order("updated_at", desc=True) \
-                .execute()
+                .order("updated_at", desc=True)
+            response = await execute_query(query)
             
             return response.data or []
         except Exception as e:
-            logger.error(f"Failed to get projects for {user_id}: {e}")
+            logger.error("Failed to get projects for %s: %s", user_id, e)
             return []
 
     async def link_user_project(self, user_id: str, project_id: str, title: str, settings: dict = {}) -> bool:
@@ -254,16 +335,16 @@ class BillingService:
         supabase = self._ensure_supabase()
 
         try:
-            supabase.table("user_projects").insert({
+            await execute_query(supabase.table("user_projects").insert({
                 "user_id": user_id,
                 "project_id": project_id,
                 "title": title,
                 "settings": settings,
                 "status": "draft"
-            }).execute()
+            }))
             return True
         except Exception as e:
-            logger.error(f"Failed to link project {project_id} to {user_id}: {e}")
+            logger.error("Failed to link project %s to %s: %s", project_id, user_id, e)
             return False
     
     # ==================== Subscriptions ====================
@@ -273,23 +354,32 @@ class BillingService:
         supabase = self._ensure_supabase()
         
         try:
-            response = supabase.table("subscriptions") \
+            query = supabase.table("subscriptions") \
                 .select("*") \
                 .eq("user_id", user_id) \
                 .eq("status", "active") \
                 .order("created_at", desc=True) \
-                .limit(1) \
-                .execute()
+                .limit(1)
+            response = await execute_query(query)
             
             if response.data and len(response.data) > 0:
                 return response.data[0]
             return None
         except Exception as e:
-            logger.error(f"Failed to get subscription for {user_id}: {e}")
+            logger.error("Failed to get subscription for %s: %s", user_id, e)
             return None
     
     async def get_subscription_status(self, user_id: str) -> SubscriptionStatus:
         """Get detailed subscription status with generation eligibility."""
+        subscription_status, _ = await self.get_billing_snapshot(user_id)
+        return subscription_status
+    
+    async def get_billing_snapshot(self, user_id: str) -> tuple[SubscriptionStatus, int]:
+        """
+        Get subscription status and credit balance together.
+        The balance is fetched once and shared with the eligibility check,
+        and both lookups run concurrently.
+        """
         if not self.is_configured:
             return SubscriptionStatus(
                 has_subscription=True,
@@ -299,11 +389,20 @@ class BillingService:
                 credits_per_month=5000,
                 can_generate=True,
                 block_reason=None
-            )
+            ), await self.get_credit_balance(user_id)
 
-        subscription = await self.get_subscription(user_id)
-        credits = await self.get_credit_balance(user_id)
-        
+        subscription, credits = await asyncio.gather(
+            self.get_subscription(user_id),
+            self.get_credit_balance(user_id),
+        )
+        return self.build_subscription_status(subscription, credits), credits
+    
+    def build_subscription_status(
+        self,
+        subscription: Optional[Dict[str, Any]],
+        credits: int
+    ) -> SubscriptionStatus:
+        """Derive subscription status and generation eligibility from raw rows."""
         if not subscription:
             return SubscriptionStatus(
                 has_subscription=False,
@@ -355,7 +454,7 @@ class BillingService:
                         block_reason="Your subscription period has ended. Please renew to continue."
                     )
             except Exception as e:
-                logger.warning(f"Failed to parse renewal date: {e}")
+                logger.warning("Failed to parse renewal date: %s", e)
         
         # Check credits
         if credits <= 0:
@@ -384,6 +483,21 @@ class BillingService:
             block_reason=None
         )
     
+    async def get_account_snapshot(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch profile, credit balance and active subscription in one round-trip.
+        Returns None if the cabinet_status function is unavailable.
+        """
+        supabase = self._ensure_supabase()
+        
+        try:
+            query = supabase.rpc("cabinet_status", {"p_user_id": user_id})
+            response = await execute_query(query)
+            return response.data or None
+        except Exception as e:
+            logger.error("Failed to get account snapshot for %s: %s", user_id, e)
+            return None
+    
     async def check_can_generate(self, user_id: str) -> tuple[bool, Optional[str]]:
         """
         Quick check if user can generate.
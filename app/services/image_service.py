@@ -6,10 +6,45 @@ from typing import Any, Callable
 from ..clients.genai import GenAIClient
 from ..repositories.project_repo import ProjectRepository
 from ..repositories.file_storage import FileStorage
+from ..core.config import settings
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Segments per interactive build_prompts request; chunks run in parallel
+PROMPT_CHUNK_SIZE = 12
+
+
+def _group_by_prompt(prompts: dict[str, Any]) -> dict[str, list[str]]:
+    """
+    Group segments that share an identical image prompt.
+    
+    Returns the first segment ID of each group mapped to every segment
+    ID in it, so each distinct prompt is generated only once per run.
+    Segments without a prompt each keep their own request.
+    """
+    groups: dict[str, list[str]] = {}
+    unprompted: dict[str, list[str]] = {}
+    for seg_id, payload in prompts.items():
+        prompt = payload.get("image_prompt")
+        if prompt:
+            groups.setdefault(prompt, []).append(seg_id)
+        else:
+            unprompted[seg_id] = [seg_id]
+    return {**{seg_ids[0]: seg_ids for seg_ids in groups.values()}, **unprompted}
+
+
+def _is_usable_prompts(result: Any) -> bool:
+    """Whether a prompts result is a map rather than a {"error", "raw"} parse failure."""
+    return isinstance(result, dict) and "error" not in result
+
+
+def _check_prompt_coverage(segments: list[dict[str, Any]], prompts: dict[str, Any]) -> None:
+    """Raise if any segment was left without a prompt."""
+    missing = {str(seg["id"]) for seg in segments if seg.get("id") is not None} - prompts.keys()
+    if missing:
+        raise RuntimeError(f"No prompts generated for segments: {', '.join(sorted(missing))}")
+
 
 class ImageService:
     """Service for generating images for segments."""
@@ -33,16 +68,20 @@ class ImageService:
     ) -> dict[str, Any]:
         """Generate image prompts for all segments."""
         if not use_batch:
-            prompts = self.genai.build_prompts(segments, analysis, use_batch=False)
+            prompts = self._build_prompts_interactive(segments, analysis)
         else:
             # --- Batch Mode ---
             from .batch_service import BatchService
             batch_service = BatchService()
             
-            req_body = self.genai.build_prompts(segments, analysis, use_batch=True)
+            # One request per chunk so the batch backend can work on them in parallel
+            req_bodies = [
+                self.genai.build_prompts(segments[i:i + PROMPT_CHUNK_SIZE], analysis, use_batch=True)
+                for i in range(0, len(segments), PROMPT_CHUNK_SIZE)
+            ]
             
             job_result = batch_service.submit_batch_job(
-                requests=[req_body],
+                requests=req_bodies,
                 model_name=self.genai.text_model,
                 job_name=f"Prompts-{project_id}"
             )
@@ -57,27 +96,16 @@ class ImageService:
             if not results:
                 raise RuntimeError("Batch prompts failed to return results")
             
-            # Parse response - results now contains raw JSONL entries
-            raw_item = results[0]
-            response_data = raw_item.get("response", {})
-            candidates = response_data.get("candidates", [])
-            
-            text_content = ""
-            if candidates:
-                parts = candidates[0].get("content", {}).get("parts", [])
-                for part in parts:
-                    if "text" in part:
-                        text_content += part["text"]
-            
-            if text_content:
-                prompts = self.genai._extract_json(text_content)
-            else:
-                # Fallback if structure is different
-                prompts = raw_item.get("response", raw_item)
-
-            # Unify structure if needed
-            if isinstance(prompts, dict) and "prompts" in prompts:
-                 prompts = prompts["prompts"]
+            prompts = {}
+            for raw_item in results:
+                chunk_prompts = self._parse_batch_prompts(raw_item)
+                if not _is_usable_prompts(chunk_prompts):
+                    logger.error("Unusable batch prompts result: %s", str(chunk_prompts)[:200])
+                    continue
+                prompts.update(chunk_prompts)
+            if not prompts:
+                raise RuntimeError("Batch prompts returned no usable results")
+            _check_prompt_coverage(segments, prompts)
 
         # Ensure version exists for local tracking
         for seg_id, data in prompts.items():
@@ -87,6 +115,73 @@ class ImageService:
         self.project_repo.save_prompts(project_id, prompts)
         return prompts
     
+    def _parse_batch_prompts(self, raw_item: dict[str, Any]) -> Any:
+        """Extract the prompts map from one raw batch result line."""
+        # Parse response - results contain raw JSONL entries
+        response_data = raw_item.get("response", {})
+        candidates = response_data.get("candidates", [])
+        
+        text_content = ""
+        if candidates:
+            parts = candidates[0].get("content", {}).get("parts", [])
+            for part in parts:
+                if "text" in part:
+                    text_content += part["text"]
+        
+        if text_content:
+            prompts = self.genai._extract_json(text_content)
+        else:
+            # Fallback if structure is different
+            prompts = raw_item.get("response", raw_item)
+
+        # Unify structure if needed
+        if isinstance(prompts, dict) and "prompts" in prompts:
+            prompts = prompts["prompts"]
+        return prompts
+    
+    def _build_prompts_interactive(
+        self,
+        segments: list[dict[str, Any]],
+        analysis: dict[str, Any],
+    ) -> dict[str, Any]:
+        """
+        Build prompts with parallel requests over chunks of segments.
+        
+        Response time grows with the number of prompts the model has to
+        write, so long storyboards are split and the chunks overlapped.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        chunks = [
+            segments[i:i + PROMPT_CHUNK_SIZE]
+            for i in range(0, len(segments), PROMPT_CHUNK_SIZE)
+        ]
+        
+        def _build(chunk: list[dict[str, Any]]) -> Any:
+            result = self.genai.build_prompts(chunk, analysis, use_batch=False)
+            if not _is_usable_prompts(result):
+                # Parse failures are never cached, so a retry gets a fresh answer
+                logger.warning("Unusable prompts result, retrying chunk: %s", str(result)[:200])
+                result = self.genai.build_prompts(chunk, analysis, use_batch=False)
+            return result
+        
+        if len(chunks) <= 1:
+            results = [_build(chunk) for chunk in chunks]
+        else:
+            logger.info("Building prompts for %s segments in %s parallel requests", len(segments), len(chunks))
+            with ThreadPoolExecutor(max_workers=settings.genai_max_concurrency) as executor:
+                results = list(executor.map(_build, chunks))
+        
+        prompts: dict[str, Any] = {}
+        for chunk_prompts in results:
+            # A failed parse comes back as {"error": ..., "raw": ...}
+            if not _is_usable_prompts(chunk_prompts):
+                logger.error("Unusable prompts result after retry: %s", str(chunk_prompts)[:200])
+                raise RuntimeError("Prompt generation returned an unusable result")
+            prompts.update(chunk_prompts)
+        _check_prompt_coverage(segments, prompts)
+        return prompts
+    
     def generate_all_images(
         self,
         project_id: str,
@@ -118,10 +213,14 @@ class ImageService:
         if progress_callback:
             progress_callback(5)
 
-        # 1. Prepare requests
+        # 1. Prepare requests, one per distinct prompt
+        groups = _group_by_prompt(prompts)
+        if len(groups) < len(prompts):
+            logger.info("Deduplicated %s prompts to %s image requests", len(prompts), len(groups))
+        
         batch_requests = []
-        for seg_id, payload in prompts.items():
-            prompt_text = payload.get("image_prompt", "")
+        for seg_id in groups:
+            prompt_text = prompts[seg_id].get("image_prompt", "")
             
             # Construct the request body for generateContent
             # We need to match the structure expected by the model for image generation
@@ -204,17 +303,16 @@ class ImageService:
                 if b64_data:
                     image_bytes = base64.b64decode(b64_data)
                     
-                    # Determine version
-                    # We might need to look up current version or just assume 1 if not present
-                    # payload = prompts.get(seg_id, {})
-                    # version = payload.get("version", 1)
-                    # Simplified: Always save as version 1 for batch init, or check generic logic
-                    version = 1 
-                    if seg_id in prompts:
-                        version = prompts[seg_id].get("version", 1)
-                        
-                    self.file_storage.save_image(project_id, seg_id, version, image_bytes)
-                    processed_count += 1
+                    # Segments with an identical prompt share this result
+                    for target_id in groups.get(seg_id, [seg_id]):
+                        # Determine version
+                        # Simplified: Always save as version 1 for batch init, or check generic logic
+                        version = 1 
+                        if target_id in prompts:
+                            version = prompts[target_id].get("version", 1)
+                            
+                        self.file_storage.save_image(project_id, target_id, version, image_bytes)
+                        processed_count += 1
             except Exception as e:
                 logger.error(f"Failed to process batch result item: {e}")
 
@@ -231,16 +329,19 @@ class ImageService:
         """Generate images for all segments in parallel (Interactive/Threaded)."""
         from concurrent.futures import ThreadPoolExecutor, as_completed
 
-        total = len(prompts)
+        groups = _group_by_prompt(prompts)
+        total = len(groups)
         completed = 0
         
         def _generate_task(item):
-            seg_id, payload = item
-            version = payload.get("version", 1)
+            seg_id, seg_ids = item
             try:
-                image_bytes = self.genai.generate_image(payload)
+                image_bytes = self.genai.generate_image(prompts[seg_id])
                 if image_bytes:
-                    self.file_storage.save_image(project_id, seg_id, version, image_bytes)
+                    # Segments with an identical prompt share this image
+                    for target_id in seg_ids:
+                        version = prompts[target_id].get("version", 1)
+                        self.file_storage.save_image(project_id, target_id, version, image_bytes)
                     return True
                 else:
                     logger.warning(f"Failed to generate image for {seg_id}")
@@ -249,9 +350,9 @@ class ImageService:
                 logger.error(f"Exception generating image for {seg_id}: {e}")
                 return False
 
-        # Run up to 5 generations in parallel
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [executor.submit(_generate_task, item) for item in prompts.items()]
+        # Bounded parallelism; requests share the GenAI client's pooled connections
+        with ThreadPoolExecutor(max_workers=settings.genai_max_concurrency) as executor:
+            futures = [executor.submit(_generate_task, item) for item in groups.items()]
             
             for future in as_completed(futures):
                 completed += 1
@@ -0,0 +1,73 @@
+"""Batched data loaders that coalesce concurrent lookups."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+from ..clients.supabase_client import execute_query, get_supabase
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProfileLoader:
+    """
+    Coalesce profile lookups issued within one event-loop tick into a single
+    `profiles` query. Results are not cached between batches, so every load
+    sees the current row.
+    """
+    
+    def __init__(self) -> None:
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._dispatch_scheduled = False
+        # The event loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def load(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Load a profile row, or None if it does not exist."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(user_id, []).append(future)
+        
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            task = loop.create_task(self._dispatch())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        
+        return await future
+    
+    async def _dispatch(self) -> None:
+        """Run one batch query for every id queued so far."""
+        pending, self._pending = self._pending, {}
+        self._dispatch_scheduled = False
+        
+        try:
+            rows = await self._batch_load(list(pending))
+        except Exception as e:
+            logger.error("Batched profile load failed for %s users: %s", len(pending), e)
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        
+        for user_id, futures in pending.items():
+            row = rows.get(user_id)
+            for future in futures:
+                if not future.done():
+                    future.set_result(row)
+    
+    async def _batch_load(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch profiles for all ids in one round-trip, keyed by id."""
+        supabase = get_supabase()
+        if not supabase:
+            return {}
+        
+        query = supabase.table("profiles").select("*").in_("id", user_ids)
+        response = await execute_query(query)
+        return {str(row["id"]): row for row in response.data or []}
+
+
+# Global loader instance (shared so concurrent requests batch together)
+profile_loader = ProfileLoader()
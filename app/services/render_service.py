@@ -13,6 +13,7 @@ from PIL import Image, ImageDraw, ImageFont
 
 from ..repositories.project_repo import ProjectRepository
 from ..repositories.file_storage import FileStorage
+from ..core.audio_utils import parse_time_str
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -24,21 +25,7 @@ def _parse_time(t_str: Any) -> float:
         return 0.0
     if isinstance(t_str, (int, float)):
         return float(t_str)
-    
-    t_str = str(t_str).replace(",", ".").strip()
-    parts = t_str.split(":")
-    
-    try:
-        if len(parts) == 1:
-            return float(parts[0])
-        if len(parts) == 2:
-            return float(parts[0]) * 60 + float(parts[1])
-        if len(parts) == 3:
-            return float(parts[0]) * 3600 + float(parts[1]) * 60 + float(parts[2])
-    except ValueError:
-        pass
-    
-    return 0.0
+    return parse_time_str(str(t_str)) or 0.0
 
 
 class RenderService:
@@ -4,8 +4,11 @@ from __future__ import annotations
 from statistics import median
 from typing import Any
 
+import numpy as np
+
 from ..clients.genai import GenAIClient
 from ..repositories.project_repo import ProjectRepository
+from ..core.audio_utils import parse_time_str
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -17,21 +20,7 @@ def _parse_time(t_str: Any) -> float:
         return 0.0
     if isinstance(t_str, (int, float)):
         return float(t_str)
-
-    t_str = str(t_str).replace(",", ".").strip()
-    parts = t_str.split(":")
-
-    try:
-        if len(parts) == 1:  # seconds
-            return float(parts[0])
-        if len(parts) == 2:  # MM:SS
-            return float(parts[0]) * 60 + float(parts[1])
-        if len(parts) == 3:  # HH:MM:SS
-            return float(parts[0]) * 3600 + float(parts[1]) * 60 + float(parts[2])
-    except ValueError:
-        pass
-
-    return 0.0
+    return parse_time_str(str(t_str)) or 0.0
 
 
 class StoryboardService:
@@ -124,16 +113,11 @@ class StoryboardService:
         MAX_DURATION = 8.0  # Maximum length for a single segment
         MIN_DURATION = 0.5  # Minimum length
         
-        # Calculate original durations
-        total_suggested = 0.0
-        for seg in segments:
-            s = _parse_time(seg.get("start_time", 0))
-            e = _parse_time(seg.get("end_time", 0))
-            seg_duration = max(0.1, e - s)
-            # Cap original duration if it's too long
-            seg_duration = min(seg_duration, MAX_DURATION * 1.5) 
-            seg["_orig_duration"] = seg_duration
-            total_suggested += seg_duration
+        # Calculate original durations, capping any that are too long
+        starts = np.fromiter((_parse_time(seg.get("start_time", 0)) for seg in segments), dtype=np.float64, count=len(segments))
+        ends = np.fromiter((_parse_time(seg.get("end_time", 0)) for seg in segments), dtype=np.float64, count=len(segments))
+        orig_durations = np.minimum(np.maximum(ends - starts, 0.1), MAX_DURATION * 1.5)
+        total_suggested = float(orig_durations.sum())
 
         # Calculate scaling factor
         scale_factor = duration / total_suggested if total_suggested > 0 else 1.0
@@ -170,74 +154,71 @@ class StoryboardService:
         else:
             timing_mode = "structure-driven"
 
-        beat_grid = sorted({0.0, *beat_times, duration}) if beat_times else [0.0, duration]
+        beat_grid = np.array(sorted({0.0, *beat_times, duration}) if beat_times else [0.0, duration])
+        grid_strengths = np.array([beat_strength_map.get(t, 0.0) for t in beat_grid.tolist()])
+        structural_grid = np.array(structural_points, dtype=np.float64)
         
-        def _get_strength(t: float) -> float:
-            return beat_strength_map.get(t, 0.0)
-
-        def _nearest_time(target: float, candidates: list[float]) -> float:
-            if not candidates: return target
-            return min(candidates, key=lambda x: abs(x - target))
+        # Rhythm context (look for 4-beat or 8-beat patterns if BPM is known)
+        beat_duration = 60.0 / bpm if bpm > 20 else 0.5
+
+        def _nearest_time(target: float, candidates: np.ndarray) -> float:
+            # Candidates are sorted, so only the neighbours of the insertion point matter
+            if not len(candidates): return target
+            idx = int(np.searchsorted(candidates, target))
+            if idx == 0: return float(candidates[0])
+            if idx == len(candidates): return float(candidates[-1])
+            left, right = float(candidates[idx - 1]), float(candidates[idx])
+            return left if abs(left - target) <= abs(right - target) else right
 
         def _snap_to_beat(time_value: float) -> float:
-            if not beat_grid: return time_value
             return _nearest_time(time_value, beat_grid)
 
+        def _near_structure(times: np.ndarray) -> np.ndarray:
+            if not len(structural_grid):
+                return np.zeros(len(times), dtype=bool)
+            idx = np.searchsorted(structural_grid, times)
+            left = structural_grid[np.maximum(idx - 1, 0)]
+            right = structural_grid[np.minimum(idx, len(structural_grid) - 1)]
+            return (np.abs(times - left) < 0.15) | (np.abs(times - right) < 0.15)
+
         def _select_smart_beat_end(start_time: float, ideal_end: float, remaining_segments: int, seg_idx: int) -> float:
-            if not beat_grid: return ideal_end
-            
             # Constraints
             min_end = start_time + MIN_DURATION
             max_end = min(start_time + MAX_DURATION, duration - (remaining_segments * MIN_DURATION))
             
-            candidates = [b for b in beat_grid if b >= min_end and b <= max_end]
-            if not candidates:
+            lo = int(np.searchsorted(beat_grid, min_end, side="left"))
+            hi = int(np.searchsorted(beat_grid, max_end, side="right"))
+            if lo >= hi:
                 return min(max_end, duration)
+            candidates = beat_grid[lo:hi]
 
             # Window for search
             window = 2.0
-            window_candidates = [c for c in candidates if abs(c - ideal_end) <= window]
-            if not window_candidates:
+            in_window = np.abs(candidates - ideal_end) <= window
+            if not in_window.any():
                 return _nearest_time(ideal_end, candidates)
             
-            best_t = window_candidates[0]
-            best_score = -1.0
+            t = candidates[in_window]
+            dist_score = 1.0 - (np.abs(t - ideal_end) / window)
+            strength = grid_strengths[lo:hi][in_window]
             
-            # Rhythm context (look for 4-beat or 8-beat patterns if BPM is known)
-            beat_duration = 60.0 / bpm if bpm > 20 else 0.5
-            
-            for t in window_candidates:
-                dist = abs(t - ideal_end)
-                dist_score = 1.0 - (dist / window)
-                strength = _get_strength(t)
-                
-                # Rhythm score: favor intervals that match 2, 4, 8 beats
-                rhythm_score = 0.0
-                if beat_duration > 0:
-                    elapsed = t - start_time
-                    beats_elapsed = elapsed / beat_duration
-                    # 1.0 if perfectly aligned with a multiple of 1, 2, or 4 beats
-                    alignment = 1.0 - (abs(beats_elapsed - round(beats_elapsed)) / 0.5)
-                    rhythm_score = alignment * 0.2
-                    
-                    # Bonus for "round" numbers of beats (4, 8, 16)
-                    if abs(beats_elapsed - 4.0) < 0.2 or abs(beats_elapsed - 8.0) < 0.2:
-                        rhythm_score += 0.3
-                    elif abs(beats_elapsed - 2.0) < 0.2:
-                        rhythm_score += 0.1
-
-                # Weighted score
-                score = 0.3 * dist_score + 0.5 * strength + 0.2 * rhythm_score
-                
-                # Structural match bonus
-                if any(abs(t - sp) < 0.15 for sp in structural_points):
-                     score += 0.4
-                
-                if score > best_score:
-                    best_score = score
-                    best_t = t
+            # Rhythm score: favor intervals that match 2, 4, 8 beats
+            beats_elapsed = (t - start_time) / beat_duration
+            # 1.0 if perfectly aligned with a multiple of 1, 2, or 4 beats
+            alignment = 1.0 - (np.abs(beats_elapsed - np.round(beats_elapsed)) / 0.5)
+            # Bonus for "round" numbers of beats (4, 8, 16)
+            bonus = np.where(
+                (np.abs(beats_elapsed - 4.0) < 0.2) | (np.abs(beats_elapsed - 8.0) < 0.2), 0.3,
+                np.where(np.abs(beats_elapsed - 2.0) < 0.2, 0.1, 0.0),
+            )
+            rhythm_score = alignment * 0.2 + bonus
+
+            # Weighted score, plus a structural match bonus
+            score = 0.3 * dist_score + 0.5 * strength + 0.2 * rhythm_score
+            score += np.where(_near_structure(t), 0.4, 0.0)
             
-            return best_t
+            best = int(np.argmax(score))
+            return float(t[best]) if score[best] > -1.0 else float(t[0])
 
         # Normalization Loop
         current_time = 0.0
@@ -249,11 +230,11 @@ class StoryboardService:
         ideal_avg = duration / num_segments
         effective_max = max(MAX_DURATION, ideal_avg * 1.3)
         
+        # Proportional targets vs dynamic max
+        target_durations = np.maximum(np.minimum(orig_durations * scale_factor, effective_max), MIN_DURATION).tolist()
+        
         for i, seg in enumerate(segments):
-            orig_dur = seg.pop("_orig_duration")
-            # Proportional target vs dynamic max
-            seg_duration = min(orig_dur * scale_factor, effective_max)
-            seg_duration = max(MIN_DURATION, seg_duration)
+            seg_duration = target_durations[i]
             
             remaining = num_segments - i - 1
 
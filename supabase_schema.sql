@@ -149,6 +149,9 @@ CREATE POLICY "Users can view own transactions" ON public.credit_transactions
 CREATE INDEX IF NOT EXISTS idx_credit_transactions_user_id ON public.credit_transactions(user_id);
 CREATE INDEX IF NOT EXISTS idx_credit_transactions_created_at ON public.credit_transactions(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_credit_transactions_type ON public.credit_transactions(type);
+-- Keyset pagination of a user's history (WHERE user_id = ? AND (created_at, id) < (?, ?))
+DROP INDEX IF EXISTS public.idx_credit_transactions_user_created_at;
+CREATE INDEX IF NOT EXISTS idx_credit_transactions_user_created_at_id ON public.credit_transactions(user_id, created_at DESC, id DESC);
 
 -- =====================================================
 -- SUBSCRIPTIONS TABLE
@@ -432,6 +435,41 @@ BEGIN
 END;
 $$;
 
+-- =====================================================
+-- CABINET STATUS FUNCTION
+-- Returns profile, credit balance and active subscription
+-- in a single round-trip for the dashboard
+-- =====================================================
+CREATE OR REPLACE FUNCTION public.cabinet_status(
+    p_user_id UUID
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT jsonb_build_object(
+        'profile', (
+            SELECT to_jsonb(p)
+            FROM public.profiles p
+            WHERE p.id = p_user_id
+        ),
+        'credits', COALESCE((
+            SELECT c.balance
+            FROM public.user_credits c
+            WHERE c.user_id = p_user_id
+        ), 0),
+        'subscription', (
+            SELECT to_jsonb(s)
+            FROM public.subscriptions s
+            WHERE s.user_id = p_user_id AND s.status = 'active'
+            ORDER BY s.created_at DESC
+            LIMIT 1
+        )
+    );
+$$;
+
 -- =====================================================
 -- GRANT PERMISSIONS
 -- Allow authenticated users to call these functions
@@ -439,6 +477,10 @@ $$;
 GRANT EXECUTE ON FUNCTION public.deduct_credits TO authenticated;
 GRANT EXECUTE ON FUNCTION public.add_credits TO authenticated;
 
+-- cabinet_status takes an arbitrary user id, so only the backend
+-- (service role) may call it
+REVOKE EXECUTE ON FUNCTION public.cabinet_status FROM PUBLIC, anon, authenticated;
+
 -- =====================================================
 -- AUTOMATIC updated_at TRIGGER
 -- Updates the updated_at column on relevant tables
@@ -479,5 +521,5 @@ DO $$
 BEGIN
     RAISE NOTICE 'Clipmaker User Cabinet schema created successfully!';
     RAISE NOTICE 'Tables created: profiles, user_credits, credit_transactions, subscriptions, user_projects, generation_history';
-    RAISE NOTICE 'Functions created: deduct_credits, add_credits';
+    RAISE NOTICE 'Functions created: deduct_credits, add_credits, cabinet_status';
 END $$;